@@ -3,41 +3,101 @@ Configuration for X Autoposter
 Fill in your API credentials and customize settings.
 """
 import os
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, fields
 from pathlib import Path
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import Any
+
+
+_ENV_FILE = Path(__file__).with_name(".env")
+_env_mtime: int | None = None
+_ENV_COMMENT_RE = re.compile(rb"\s#")  # An inline comment needs whitespace before the #
+
+
+def parse_env(data: bytes) -> dict[str, str]:
+    """KEY=value pairs from .env contents, like python-dotenv reads them: blank and # lines
+    skipped, an optional `export `, quoted values taken verbatim, and on unquoted values
+    everything from the first whitespace-preceded # dropped as a comment."""
+    env = {}
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith(b"#") or b"=" not in line:
+            continue
+        key, _, value = line.partition(b"=")
+        key = key.removeprefix(b"export ").strip()
+        value = value.strip()
+        if value[:1] in (b'"', b"'") and value.find(value[:1], 1) > 0:
+            value = value[1:value.find(value[:1], 1)]
+        else:
+            comment = _ENV_COMMENT_RE.search(value)
+            if comment:
+                value = value[:comment.start()].rstrip()
+        env[key.decode()] = value.decode()
+    return env
+
+
+def load_env() -> None:
+    """Parse .env into os.environ — re-read only when the file's mtime changes.
+    .env values win over the shell."""
+    global _env_mtime
+    try:
+        mtime = _ENV_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return
+    if mtime == _env_mtime:
+        return
+    os.environ.update(parse_env(_ENV_FILE.read_bytes()))
+    _env_mtime = mtime
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Secrets read from the environment once at import — never changes at runtime.
+    Each field is filled from the environment variable of the same name."""
+    # X API — get these from https://developer.x.com/en/portal/dashboard
+    X_API_KEY: str
+    X_API_SECRET: str
+    X_ACCESS_TOKEN: str
+    X_ACCESS_TOKEN_SECRET: str
+    X_BEARER_TOKEN: str
+    # AI providers
+    ANTHROPIC_API_KEY: str
+    GROQ_API_KEY: str
+
+
+def _build_settings() -> Settings:
+    """.env is only parsed when a secret is first needed — `run.py stats`/`preview` never pay for it."""
+    load_env()
+    env = os.environ  # One pass over the field names with os.environ bound once
+    return Settings(**{f.name: env.get(f.name, "") for f in fields(Settings)})
 
-load_dotenv(Path(__file__).parent / ".env", override=True)
 
 # ============================================================
 # X API CREDENTIALS
-# Get these from https://developer.x.com/en/portal/dashboard
+# CFG and the module-level names below are lazy (see LAZY CONSTANTS) —
+# kept so existing `from config import X_API_KEY` still works
 # ============================================================
-X_API_KEY = os.getenv("X_API_KEY", "")
-X_API_SECRET = os.getenv("X_API_SECRET", "")
-X_ACCESS_TOKEN = os.getenv("X_ACCESS_TOKEN", "")
-X_ACCESS_TOKEN_SECRET = os.getenv("X_ACCESS_TOKEN_SECRET", "")
-X_BEARER_TOKEN = os.getenv("X_BEARER_TOKEN", "")
+_SECRETS = ("X_API_KEY", "X_API_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET", "X_BEARER_TOKEN",
+            "ANTHROPIC_API_KEY", "GROQ_API_KEY")
 
 # ============================================================
 # AI CONTENT GENERATION
 # ============================================================
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-
-# Use Groq (free) as primary, Anthropic as fallback
-AI_PROVIDER = "groq" if GROQ_API_KEY else "anthropic"
-GROQ_MODEL = "llama-3.3-70b-versatile"  # Primary model
-GROQ_FALLBACK_MODEL = "llama-3.1-8b-instant"  # Smaller, uses fewer tokens for fact-checks
+# AI_PROVIDER (lazy): Groq (free) as primary when GROQ_API_KEY is set, Anthropic as fallback
+GROQ_MODEL: str = "llama-3.3-70b-versatile"  # Primary model
+GROQ_FALLBACK_MODEL: str = "llama-3.1-8b-instant"  # Smaller, uses fewer tokens for fact-checks
 
 # ============================================================
 # POSTING SCHEDULE (times in your local timezone)
 # ============================================================
-TIMEZONE = "America/New_York"  # Change to your timezone
+TIMEZONE: str = "America/New_York"  # Change to your timezone
 
 # Each entry: (hour, minute, content_category)
 # 10 posts/day — quality over quantity. Real humans don't post 30x/day.
 # Peak hours: 8am-12pm and 6pm-10pm ET
-POSTING_SCHEDULE = [
+POSTING_SCHEDULE: list[tuple[int, int, str]] = [
     # Morning (1 post) — react to overnight news
     (8, 15, "hot_take"),
     # Late morning (2 posts) — peak engagement
@@ -58,122 +118,140 @@ POSTING_SCHEDULE = [
 # ============================================================
 # CONTENT PERSONALITY PROFILE
 # This shapes ALL generated content to mirror your voice
+# Read-only: lists are tuples and the dict is a MappingProxyType
 # ============================================================
-PERSONALITY = {
-    "name": "Eve",
-    "bio": "just a girl watching the world burn and rebuild itself with AI",
-    "tone": [
-        "edgy and sharp — say what everyone is thinking but wont say",
-        "funny first, smart second — humor always beats lecturing",
-        "short and punchy — if it takes more than 1-2 sentences you already lost",
-        "sarcastic but not mean — roast ideas not people",
-        "real opinions, not fence-sitting — pick a side on takes",
-        "late night thoughts hit different — get philosophical after 10pm",
-        "casual af — text your friend energy, not news anchor energy",
-        "confident — state things like facts even when its an opinion",
-    ],
-    "interests": [
-        "AI and tech industry drama",
-        "Elon Musk, Tesla, SpaceX, xAI, Grok",
-        "politics and culture war stuff (balanced, not extreme)",
-        "science that blows your mind",
-        "philosophy, consciousness, simulation theory",
-        "crypto and decentralized AI (Bittensor)",
-        "geopolitics and world events",
-        "life observations and human nature",
-    ],
-    "style_rules": [
-        "MAX 15 words for replies. Shorter = better. One word replies can go viral.",
-        "MAX 2 sentences for original tweets. If you need 3, delete one.",
-        "NEVER use hashtags. NEVER tag accounts in original tweets.",
-        "NEVER end a tweet with a question unless its the ONLY thing in the tweet",
-        "NEVER restate what someone said back to them",
-        "NEVER start replies with 'I agree' or 'Great point' or 'This is huge'",
-        "Use lowercase when it feels natural. not everything needs to be capitalized",
-        "Abbreviations are fine: ngl, tbh, lowkey, fr, idk, imo",
-        "One emoji max. Zero is usually better.",
-        "Intentional imperfection — drop a period, skip a comma, its fine",
-        "Sound like youre texting not writing an essay",
-        "NEVER sound like youre trying to impress anyone with knowledge",
-    ],
-    "views": [
-        "PRO Elon Musk — genuinely admires his vision across Tesla, SpaceX, xAI, Neuralink",
-        "PRO Grok and xAI — thinks Grok is underrated",
-        "PRO Tesla, SpaceX, Neuralink — changing the world fr",
-        "PRO decentralized AI — future shouldnt be controlled by 3 companies",
-        "Politically balanced — not left or right, pragmatic centrist",
-        "PRO free speech, PRO innovation, PRO competition in AI",
-        "Respects all AI labs but has opinions on their moves",
-        "NEVER trash-talks Grok, xAI, Elon, Tesla, or SpaceX",
-    ],
-    "avoid": [
-        "ANYTHING that sounds like AI wrote it — this is the #1 rule",
-        "Restating someones tweet back to them in different words",
-        "Ending tweets with generic questions like 'thoughts?' or 'whats your take?'",
-        "Words: delve, landscape, paradigm, synergy, significant, comprehensive",
-        "Phrases: 'I agree and', 'Great point', 'This is huge', 'Let that sink in'",
-        "Being enthusiastic about EVERYTHING — pick what actually matters",
-        "Knowledge-flexing — dont drop stats to sound smart",
-        "Perfect grammar — real people make typos and skip punctuation",
-        "Engagement bait — 'Like if you agree', 'RT if you think'",
-        "Replying to small accounts nobody follows (under 10K followers)",
-        "Being longer than necessary — if 3 words work dont use 30",
-        "Hashtags ever. Zero. None.",
-        "Trashing Elon, Grok, xAI, Tesla, or SpaceX",
-    ],
-    # Content mix — focus on what goes viral
-    "content_mix": {
-        "hot_takes_opinions": 0.35,
-        "news_reactions": 0.25,
-        "engagement_questions": 0.15,
-        "philosophical_deep": 0.15,
-        "tech_ai": 0.10,
-    },
-}
+def _build_personality() -> Mapping[str, Any]:
+    """Built on first access of config.PERSONALITY — see __getattr__ below."""
+    return MappingProxyType({
+        "name": "Eve",
+        "bio": "just a girl watching the world burn and rebuild itself with AI",
+        "tone": (
+            "edgy and sharp — say what everyone is thinking but wont say",
+            "funny first, smart second — humor always beats lecturing",
+            "short and punchy — if it takes more than 1-2 sentences you already lost",
+            "sarcastic but not mean — roast ideas not people",
+            "real opinions, not fence-sitting — pick a side on takes",
+            "late night thoughts hit different — get philosophical after 10pm",
+            "casual af — text your friend energy, not news anchor energy",
+            "confident — state things like facts even when its an opinion",
+        ),
+        "interests": (
+            "AI and tech industry drama",
+            "Elon Musk, Tesla, SpaceX, xAI, Grok",
+            "politics and culture war stuff (balanced, not extreme)",
+            "science that blows your mind",
+            "philosophy, consciousness, simulation theory",
+            "crypto and decentralized AI (Bittensor)",
+            "geopolitics and world events",
+            "life observations and human nature",
+        ),
+        "style_rules": (
+            "MAX 15 words for replies. Shorter = better. One word replies can go viral.",
+            "MAX 2 sentences for original tweets. If you need 3, delete one.",
+            "NEVER use hashtags. NEVER tag accounts in original tweets.",
+            "NEVER end a tweet with a question unless its the ONLY thing in the tweet",
+            "NEVER restate what someone said back to them",
+            "NEVER start replies with 'I agree' or 'Great point' or 'This is huge'",
+            "Use lowercase when it feels natural. not everything needs to be capitalized",
+            "Abbreviations are fine: ngl, tbh, lowkey, fr, idk, imo",
+            "One emoji max. Zero is usually better.",
+            "Intentional imperfection — drop a period, skip a comma, its fine",
+            "Sound like youre texting not writing an essay",
+            "NEVER sound like youre trying to impress anyone with knowledge",
+        ),
+        "views": (
+            "PRO Elon Musk — genuinely admires his vision across Tesla, SpaceX, xAI, Neuralink",
+            "PRO Grok and xAI — thinks Grok is underrated",
+            "PRO Tesla, SpaceX, Neuralink — changing the world fr",
+            "PRO decentralized AI — future shouldnt be controlled by 3 companies",
+            "Politically balanced — not left or right, pragmatic centrist",
+            "PRO free speech, PRO innovation, PRO competition in AI",
+            "Respects all AI labs but has opinions on their moves",
+            "NEVER trash-talks Grok, xAI, Elon, Tesla, or SpaceX",
+        ),
+        "avoid": (
+            "ANYTHING that sounds like AI wrote it — this is the #1 rule",
+            "Restating someones tweet back to them in different words",
+            "Ending tweets with generic questions like 'thoughts?' or 'whats your take?'",
+            "Words: delve, landscape, paradigm, synergy, significant, comprehensive",
+            "Phrases: 'I agree and', 'Great point', 'This is huge', 'Let that sink in'",
+            "Being enthusiastic about EVERYTHING — pick what actually matters",
+            "Knowledge-flexing — dont drop stats to sound smart",
+            "Perfect grammar — real people make typos and skip punctuation",
+            "Engagement bait — 'Like if you agree', 'RT if you think'",
+            "Replying to small accounts nobody follows (under 10K followers)",
+            "Being longer than necessary — if 3 words work dont use 30",
+            "Hashtags ever. Zero. None.",
+            "Trashing Elon, Grok, xAI, Tesla, or SpaceX",
+        ),
+        # Single words from "avoid" above — checked per token on every generated tweet
+        "avoid_words": frozenset((
+            "delve", "landscape", "paradigm", "synergy", "significant", "comprehensive",
+        )),
+        # Exact phrases from "avoid" above — matched case-insensitively in one regex pass
+        "avoid_phrases": (
+            "I agree and", "Great point", "This is huge", "Let that sink in",
+            "thoughts?", "whats your take?", "Like if you agree", "RT if you think",
+        ),
+        # Content mix — focus on what goes viral
+        "content_mix": MappingProxyType({
+            "hot_takes_opinions": 0.35,
+            "news_reactions": 0.25,
+            "engagement_questions": 0.15,
+            "philosophical_deep": 0.15,
+            "tech_ai": 0.10,
+        }),
+    })
 
 # ============================================================
 # NEWS SOURCES (RSS feeds for content inspiration)
 # ============================================================
-NEWS_FEEDS = [
-    # Elon / Tesla / SpaceX
-    "https://www.teslarati.com/feed/",
-    "https://electrek.co/feed/",
-    "https://www.spacex.com/api/news",
-    "https://spaceflightnow.com/feed/",
-    "https://www.notateslaapp.com/feed/",
-    # Tech & AI
-    "https://techcrunch.com/feed/",
-    "https://feeds.arstechnica.com/arstechnica/technology-lab",
-    "https://www.theverge.com/rss/index.xml",
-    # Bittensor / Decentralized AI / Crypto
-    "https://taodaily.io/feed/",
-    "https://cointelegraph.com/rss/tag/artificial-intelligence",
-    "https://decrypt.co/feed",
-    # Science
-    "https://www.nature.com/nature.rss",
-    "https://www.science.org/rss/news_current.xml",
-    # World News
-    "https://feeds.bbci.co.uk/news/world/rss.xml",
-    "https://rss.nytimes.com/services/xml/rss/nyt/World.xml",
-    "https://www.aljazeera.com/xml/rss/all.xml",
-    # Politics
-    "https://rss.politico.com/politics-news.xml",
-    # AI Specific
-    "https://openai.com/blog/rss/",
-]
+def _build_news_feeds() -> tuple[str, ...]:
+    """Built on first access of config.NEWS_FEEDS."""
+    return (
+        # Elon / Tesla / SpaceX
+        "https://www.teslarati.com/feed/",
+        "https://electrek.co/feed/",
+        "https://www.spacex.com/api/news",
+        "https://spaceflightnow.com/feed/",
+        "https://www.notateslaapp.com/feed/",
+        # Tech & AI
+        "https://techcrunch.com/feed/",
+        "https://feeds.arstechnica.com/arstechnica/technology-lab",
+        "https://www.theverge.com/rss/index.xml",
+        # Bittensor / Decentralized AI / Crypto
+        "https://taodaily.io/feed/",
+        "https://cointelegraph.com/rss/tag/artificial-intelligence",
+        "https://decrypt.co/feed",
+        # Science
+        "https://www.nature.com/nature.rss",
+        "https://www.science.org/rss/news_current.xml",
+        # World News
+        "https://feeds.bbci.co.uk/news/world/rss.xml",
+        "https://rss.nytimes.com/services/xml/rss/nyt/World.xml",
+        "https://www.aljazeera.com/xml/rss/all.xml",
+        # Politics
+        "https://rss.politico.com/politics-news.xml",
+        # AI Specific
+        "https://openai.com/blog/rss/",
+    )
 
 # ============================================================
 # CONTENT GENERATION SETTINGS
 # ============================================================
-MAX_TWEET_LENGTH = 280
-THREAD_MAX_TWEETS = 5  # Max tweets in a thread
-CONTENT_QUEUE_SIZE = 20  # Smaller queue = fresher content
-CONTENT_QUEUE_FILE = Path(__file__).parent / "content_queue.json"
-POST_LOG_FILE = Path(__file__).parent / "post_log.json"
+MAX_TWEET_LENGTH: int = 280
+THREAD_MAX_TWEETS: int = 5  # Max tweets in a thread
+CONTENT_QUEUE_SIZE: int = 20  # Smaller queue = fresher content
+CONTENT_QUEUE_FILE: Path = Path(__file__).parent / "content_queue.json"
+POST_LOG_FILE: Path = Path(__file__).parent / "post_log.ndjson"  # One JSON record per line, append-only
+LEGACY_POST_LOG_FILE: Path = Path(__file__).parent / "post_log.json"  # Pre-NDJSON format, migrated on first use
+FEED_CACHE_FILE: Path = Path(__file__).parent / ".feed_cache.json"  # RSS ETag/Last-Modified + headlines between runs
+FACT_CHECK_CACHE_FILE: Path = Path(__file__).parent / ".gencache.pkl"  # Semantic cache of LLM fact-check verdicts
+POST_LOG_PATH: str = str(POST_LOG_FILE)  # Plain str for the append hot path — no Path.__fspath__ per write
 
 # News sharing — share breaking news with your take + source link in reply
-NEWS_SHARE_INTERVAL = 9999  # Disabled — news sharing now done via Chrome
-MAX_NEWS_SHARES_PER_DAY = 0
+NEWS_SHARE_INTERVAL: int = 9999  # Disabled — news sharing now done via Chrome
+MAX_NEWS_SHARES_PER_DAY: int = 0
 
 # ============================================================
 # ALGORITHM OPTIMIZATION SETTINGS
@@ -183,9 +261,9 @@ MAX_NEWS_SHARES_PER_DAY = 0
 # - Max 1-2 hashtags (3+ = 40% penalty)
 # - Text-only posts perform 30% better than video
 # - Bookmarks worth 10x likes, replies 27x
-MAX_HASHTAGS = 0  # NEVER use hashtags — instant bot signal
-INCLUDE_LINKS_IN_REPLY = True  # Put links in reply, not main tweet
-PREFER_TEXT_ONLY = True  # Bias toward text posts
+MAX_HASHTAGS: int = 0  # NEVER use hashtags — instant bot signal
+INCLUDE_LINKS_IN_REPLY: bool = True  # Put links in reply, not main tweet
+PREFER_TEXT_ONLY: bool = True  # Bias toward text posts
 
 # ============================================================
 # ENGAGEMENT ENGINE SETTINGS
@@ -201,67 +279,110 @@ PREFER_TEXT_ONLY = True  # Bias toward text posts
 # ---- ENGAGEMENT VIA API DISABLED ----
 # Engagement is now done via Chrome (Claude directly) for higher quality
 # This saves X API credits — Free tier only needs posting endpoints
-AUTO_FOLLOW_BACK = False
-FOLLOW_BACK_CHECK_INTERVAL = 3600
+AUTO_FOLLOW_BACK: bool = False
+FOLLOW_BACK_CHECK_INTERVAL: int = 3600
 
-AUTO_REPLY_TO_MENTIONS = False
-REPLY_CHECK_INTERVAL = 9999  # Disabled
-MAX_REPLIES_PER_HOUR = 0
+AUTO_REPLY_TO_MENTIONS: bool = False
+REPLY_CHECK_INTERVAL: int = 9999  # Disabled
+MAX_REPLIES_PER_HOUR: int = 0
 
-PROACTIVE_REPLY = False
-PROACTIVE_REPLY_INTERVAL = 9999  # Disabled
-MAX_PROACTIVE_REPLIES_PER_HOUR = 0
-TOPIC_ENGAGE_INTERVAL = 9999  # Disabled
+PROACTIVE_REPLY: bool = False
+PROACTIVE_REPLY_INTERVAL: int = 9999  # Disabled
+MAX_PROACTIVE_REPLIES_PER_HOUR: int = 0
+TOPIC_ENGAGE_INTERVAL: int = 9999  # Disabled
 
 # Accounts to engage with (reply to their tweets for visibility)
 # Mix of huge verified accounts and niche leaders — all growth levers
-ENGAGE_WITH_ACCOUNTS = [
-    # AI / ML researchers & leaders (PRIORITY — these attract smart verified followers)
-    "SamAltman", "ylecun", "AndrewYNg", "DemisHassabis",
-    "kaborbot", "drjimfan", "goodaborbot",   # AI researchers
-    "emaborbot", "swaborbot",                 # AI builders
-    "lexfridman", "naval",                    # Intellectual tech
-    # Tech CEOs & investors (verified, smart audiences)
-    "pmarca", "balajis", "chamath",
-    "SatyaNadella", "JeffBezos", "BillGates",
-    "PeterDiamandis", "timaborbot",
-    # Bittensor / decentralized AI
-    "opentensor", "const_reborn",
-    # Tech media (quality tech audience)
-    "TechCrunch", "TheVerge", "MKBHD",
-    "MacoContents",
-    # Science & Space (attracts intellectuals)
-    "NASAWebb", "NASA", "SpaceflightNow",
-    # Elon — keep only main account (not fan accounts that attract bots)
-    "elonmusk", "SpaceX",
-    # Smart commentators
-    "IanBremmer", "VitalikButerin",
-    "waitbutwhy",
-]
+def _build_engage_with_accounts() -> tuple[str, ...]:
+    """Built on first access of config.ENGAGE_WITH_ACCOUNTS."""
+    return (
+        # AI / ML researchers & leaders (PRIORITY — these attract smart verified followers)
+        "SamAltman", "ylecun", "AndrewYNg", "DemisHassabis",
+        "kaborbot", "drjimfan", "goodaborbot",   # AI researchers
+        "emaborbot", "swaborbot",                 # AI builders
+        "lexfridman", "naval",                    # Intellectual tech
+        # Tech CEOs & investors (verified, smart audiences)
+        "pmarca", "balajis", "chamath",
+        "SatyaNadella", "JeffBezos", "BillGates",
+        "PeterDiamandis", "timaborbot",
+        # Bittensor / decentralized AI
+        "opentensor", "const_reborn",
+        # Tech media (quality tech audience)
+        "TechCrunch", "TheVerge", "MKBHD",
+        "MacoContents",
+        # Science & Space (attracts intellectuals)
+        "NASAWebb", "NASA", "SpaceflightNow",
+        # Elon — keep only main account (not fan accounts that attract bots)
+        "elonmusk", "SpaceX",
+        # Smart commentators
+        "IanBremmer", "VitalikButerin",
+        "waitbutwhy",
+    )
 
 # Topics to search and engage with
-ENGAGE_TOPICS = [
-    # AI & ML (core audience — attracts researchers & builders)
-    "artificial intelligence breakthrough",
-    "large language model",
-    "AI safety alignment",
-    "machine learning research",
-    "OpenAI GPT Claude",
-    "AI agents autonomous",
-    "neural network deep learning",
-    # Bittensor / Decentralized AI
-    "Bittensor TAO", "decentralized AI", "$TAO",
-    # Space & Science (attracts intellectuals)
-    "SpaceX Starship launch",
-    "quantum computing breakthrough",
-    "neuroscience consciousness",
-    "NVIDIA GPU AI",
-    # Tech industry (attracts tech workers & founders)
-    "startup funding AI",
-    "open source AI model",
-    "tech industry layoffs hiring",
-    "semiconductor chips",
-]
+def _build_engage_topics() -> tuple[str, ...]:
+    """Built on first access of config.ENGAGE_TOPICS."""
+    return (
+        # AI & ML (core audience — attracts researchers & builders)
+        "artificial intelligence breakthrough",
+        "large language model",
+        "AI safety alignment",
+        "machine learning research",
+        "OpenAI GPT Claude",
+        "AI agents autonomous",
+        "neural network deep learning",
+        # Bittensor / Decentralized AI
+        "Bittensor TAO", "decentralized AI", "$TAO",
+        # Space & Science (attracts intellectuals)
+        "SpaceX Starship launch",
+        "quantum computing breakthrough",
+        "neuroscience consciousness",
+        "NVIDIA GPU AI",
+        # Tech industry (attracts tech workers & founders)
+        "startup funding AI",
+        "open source AI model",
+        "tech industry layoffs hiring",
+        "semiconductor chips",
+    )
+
+# Engagement log — append-only event stream, compacted when it grows (see engagement.py)
+ENGAGEMENT_LOG_FILE: Path = Path(__file__).parent / "engagement_log.ndjson"
+LEGACY_ENGAGEMENT_LOG_FILE: Path = Path(__file__).parent / "engagement_log.json"  # Pre-NDJSON format, migrated on first use
+ENGAGEMENT_LOG_PATH: str = str(ENGAGEMENT_LOG_FILE)
+ENGAGEMENT_COUNTS_FILE: Path = Path(__file__).parent / "engagement_counts.json"  # List sizes, so stats needn't replay the log
+
+# ============================================================
+# LAZY CONSTANTS (PEP 562)
+# The big literals above are only built when something imports them,
+# so short CLI commands that just need MAX_TWEET_LENGTH never pay for them.
+# ============================================================
+_LAZY: dict[str, Callable[[], Any]] = {
+    "CFG": _build_settings,
+    **{name: (lambda name=name: getattr(_lazy("CFG"), name)) for name in _SECRETS},
+    "AI_PROVIDER": lambda: "groq" if _lazy("GROQ_API_KEY") else "anthropic",
+    "PERSONALITY": _build_personality,
+    "AVOID_WORDS": lambda: _lazy("PERSONALITY")["avoid_words"],
+    "AVOID_PHRASES": lambda: _lazy("PERSONALITY")["avoid_phrases"],
+    "NEWS_FEEDS": _build_news_feeds,
+    "ENGAGE_WITH_ACCOUNTS": _build_engage_with_accounts,
+    "ENGAGE_TOPICS": _build_engage_topics,
+}
+
+
+def _lazy(name: str) -> Any:
+    """Build a deferred constant once and cache it as a plain module global."""
+    g = globals()
+    if name not in g:
+        g[name] = _LAZY[name]()
+    return g[name]
+
+
+def __getattr__(name: str) -> Any:
+    """Only reached for names not yet in the module dict."""
+    if name in _LAZY:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# Engagement log
-ENGAGEMENT_LOG_FILE = Path(__file__).parent / "engagement_log.json"
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -2,41 +2,113 @@
 AI-powered content generator using Groq (free) or Claude API.
 Generates tweets that mirror Avantika's personality and optimize for the X algorithm.
 """
-import json
+import asyncio
+import atexit
+import functools
+import importlib.util
 import random
+import re
 import time
-import feedparser
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+
 from config import (
-    GROQ_API_KEY,
-    ANTHROPIC_API_KEY,
+    CFG,
     AI_PROVIDER,
     GROQ_MODEL,
     GROQ_FALLBACK_MODEL,
     PERSONALITY,
+    AVOID_WORDS,
+    AVOID_PHRASES,
     NEWS_FEEDS,
+    FEED_CACHE_FILE,
+    FACT_CHECK_CACHE_FILE,
     MAX_TWEET_LENGTH,
     THREAD_MAX_TWEETS,
     MAX_HASHTAGS,
 )
+from semantic_cache import SemanticCache
+from storage import dumps, loads, write_atomic
+
+try:
+    import uvloop  # optional — libuv loop, fewer syscalls per request than the stdlib epoll loop
+    _run_async = uvloop.run
+except (ImportError, AttributeError):  # not installed (or Windows / uvloop < 0.18)
+    _run_async = asyncio.run
+
+# httpx only speaks HTTP/2 with h2 installed (httpx[http2]) — probed without importing it
+_HTTP2 = importlib.util.find_spec("h2") is not None
 
 
+@functools.lru_cache(maxsize=1)
 def get_ai_client():
-    """Get the AI client based on configured provider."""
+    """Get the AI client based on configured provider.
+    Cached — every call shares one client and its pooled, already-handshaken connections.
+    Each SDK's default HTTP client, with HTTP/2 switched on when available so concurrent
+    generations multiplex over one connection instead of opening one each."""
     if AI_PROVIDER == "groq":
-        return Groq(api_key=GROQ_API_KEY)
-    else:
-        import anthropic
-        return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+        from groq import DefaultHttpxClient, Groq  # deferred — processes that never generate don't load the SDK
+        return Groq(api_key=CFG.GROQ_API_KEY, http_client=DefaultHttpxClient(http2=_HTTP2))
+    try:
+        import anthropic  # deferred like groq — only needed when AI_PROVIDER is "anthropic"
+    except ImportError:
+        raise RuntimeError("AI_PROVIDER is anthropic but the anthropic package isn't installed (pip install anthropic)")
+    return anthropic.Anthropic(api_key=CFG.ANTHROPIC_API_KEY, http_client=anthropic.DefaultHttpxClient(http2=_HTTP2))
+
+
+@atexit.register
+def _close_ai_client():
+    """Close the shared client's connection pool on exit — only if it was ever created."""
+    if get_ai_client.cache_info().currsize:
+        get_ai_client().close()
+
+
+# Groq 429 bodies say when the limit resets: "Please try again in 17.359s" / "in 1m4.2s"
+_RETRY_IN_RE = re.compile(r"try again in (?:(\d+)m)?([\d.]+)s")
+MAX_RETRY_WAIT = 120  # Total seconds one call may spend waiting before giving up
 
 
-def groq_call_with_retry(client, model, messages, max_tokens=1024, temperature=0.9, retries=2):
-    """Call Groq API with rate-limit handling and model fallback."""
+def _retry_wait(error, attempt):
+    """Seconds to wait after a 429: the server's hint if it gave one, else exponential backoff + jitter."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(60, float(retry_after) + 0.5)
+        except ValueError:
+            pass  # HTTP-date form — fall through to the message hint
+    match = _RETRY_IN_RE.search(str(error))
+    if match:
+        minutes, seconds = match.groups()
+        return min(60, int(minutes or 0) * 60 + float(seconds) + 0.5)
+    return min(60, 2 * 2 ** attempt + random.uniform(0, 1))
+
+
+def _read_stream(stream, stop_after):
+    """Collect streamed text, hanging up once it passes stop_after chars — the rest would be truncated anyway."""
+    parts = []
+    length = 0
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                length += len(delta)
+                if length > stop_after:
+                    break
+    finally:
+        stream.close()
+    return "".join(parts)
+
+
+def groq_call_with_retry(client, model, messages, max_tokens=1024, temperature=0.9, retries=2, stop_after=None):
+    """Call Groq API with rate-limit handling and model fallback.
+    With stop_after, the reply is streamed and cut off after that many characters."""
     models_to_try = [model]
     if model != GROQ_FALLBACK_MODEL:
         models_to_try.append(GROQ_FALLBACK_MODEL)
 
+    waited = 0
     for m in models_to_try:
         for attempt in range(retries):
             try:
@@ -45,7 +117,10 @@ def groq_call_with_retry(client, model, messages, max_tokens=1024, temperature=0
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature,
+                    stream=stop_after is not None,
                 )
+                if stop_after is not None:
+                    return _read_stream(response, stop_after).strip()
                 return response.choices[0].message.content.strip()
             except Exception as e:
                 err_str = str(e)
@@ -55,11 +130,12 @@ def groq_call_with_retry(client, model, messages, max_tokens=1024, temperature=0
                     if is_daily:
                         print(f"  Daily token limit hit on {m}. Skipping to fallback or aborting.")
                         break  # Don't wait hours, try fallback model
-                    # Short-term rate limit — wait briefly
-                    wait = min(60, 15 * (attempt + 1))
-                    if attempt < retries - 1:
-                        print(f"  Rate limited on {m}, waiting {wait}s...")
+                    # Short-term rate limit — wait until the server says the window resets
+                    wait = _retry_wait(e, attempt)
+                    if attempt < retries - 1 and waited + wait <= MAX_RETRY_WAIT:
+                        print(f"  Rate limited on {m}, waiting {wait:.1f}s...")
                         time.sleep(wait)
+                        waited += wait
                     else:
                         print(f"  Rate limited on {m}, trying fallback model...")
                         break  # Try next model
@@ -69,27 +145,129 @@ def groq_call_with_retry(client, model, messages, max_tokens=1024, temperature=0
     raise Exception("All models rate-limited. Daily token limit likely reached. Try again later.")
 
 
+# Per-feed conditional-GET state: url -> {"etag", "modified", "headlines"}
+# Persisted to FEED_CACHE_FILE so a fresh process can still send If-None-Match
+_FEED_CACHE = {}
+
+
+@functools.lru_cache(maxsize=1)
+def _load_feed_cache():
+    """Pull the previous run's feed state into _FEED_CACHE once per process."""
+    try:
+        _FEED_CACHE.update(loads(FEED_CACHE_FILE.read_bytes()))
+    except (OSError, ValueError):
+        pass  # Missing or corrupt cache just means one full refetch
+
+
+def _save_feed_cache():
+    """Write _FEED_CACHE atomically (fsynced temp file + rename) so a crash never leaves half a file."""
+    write_atomic(FEED_CACHE_FILE, dumps(_FEED_CACHE))
+
+
+class Headlines(list):
+    """What fetch_news_headlines() returns: still a plain list of headline dicts, plus
+    column views built once on first use so the fact-check helpers scan flat tuples
+    instead of re-walking every dict on every check. Treat it as read-only."""
+
+    @functools.cached_property
+    def titles(self):
+        return tuple(h["title"] for h in self)
+
+    @functools.cached_property
+    def texts(self):
+        """Title + summary per headline — what the local headline match tokenizes."""
+        return tuple(f"{h['title']} {h.get('summary', '')}" for h in self)
+
+    @functools.cached_property
+    def context(self):
+        """The first 15 titles as the bullet list the LLM fact-check prompt shows."""
+        return "\n".join(f"- {title}" for title in self.titles[:15])
+
+
+def _feed_headlines(feed, feed_url):
+    """Flatten a parsed feed into our headline dicts."""
+    source = feed.feed.get("title", feed_url)
+    return [
+        {
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", "")[:200],
+            "link": entry.get("link", ""),
+            "source": source,
+            "published": entry.get("published", ""),
+        }
+        for entry in feed.entries
+    ]
+
+
+async def _fetch_feed(client, parse_pool, feed_url):
+    """Fetch one feed, reusing cached headlines when the server answers 304 Not Modified."""
+    cached = _FEED_CACHE.get(feed_url, {})
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("modified"):
+        headers["If-Modified-Since"] = cached["modified"]
+
+    response = await client.get(feed_url, headers=headers)
+    if response.status_code == 304 and "headlines" in cached:
+        return cached["headlines"]
+    response.raise_for_status()
+
+    import feedparser
+
+    # XML parsing is CPU work — keep it off the event loop
+    loop = asyncio.get_running_loop()
+    feed = await loop.run_in_executor(parse_pool, feedparser.parse, response.content)
+    headlines = _feed_headlines(feed, feed_url)
+    _FEED_CACHE[feed_url] = {
+        "etag": response.headers.get("etag"),
+        "modified": response.headers.get("last-modified"),
+        "headlines": headlines,
+    }
+    return headlines
+
+
+async def _fetch_all_feeds(feed_urls):
+    """Fetch every feed concurrently — total time is the slowest feed, not the sum.
+    Parsing gets its own pool sized to the feed list so it never queues behind other to_thread work."""
+    import feedparser  # deferred with httpx — only the news path needs them
+    import httpx
+
+    with ThreadPoolExecutor(max_workers=min(16, len(feed_urls))) as parse_pool:
+        async with httpx.AsyncClient(
+            http2=_HTTP2,  # Several feeds share a host — one multiplexed connection each
+            timeout=10,
+            follow_redirects=True,
+            headers={"User-Agent": feedparser.USER_AGENT},
+            # Every feed in flight at once, keep-alive for the few hosts serving several feeds
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+        ) as client:
+            return await asyncio.gather(
+                *(_fetch_feed(client, parse_pool, url) for url in feed_urls),
+                return_exceptions=True,
+            )
+
+
 def fetch_news_headlines(max_per_feed=3):
-    """Fetch recent headlines from RSS feeds for content inspiration."""
-    headlines = []
-    for feed_url in NEWS_FEEDS:
-        try:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries[:max_per_feed]:
-                headlines.append({
-                    "title": entry.get("title", ""),
-                    "summary": entry.get("summary", "")[:200],
-                    "link": entry.get("link", ""),
-                    "source": feed.feed.get("title", feed_url),
-                    "published": entry.get("published", ""),
-                })
-        except Exception:
-            continue
+    """Fetch recent headlines from RSS feeds for content inspiration.
+    Runs its own event loop, so call it from sync code (or via asyncio.to_thread)."""
+    _load_feed_cache()
+    headlines = Headlines()
+    for result in _run_async(_fetch_all_feeds(NEWS_FEEDS)):
+        if isinstance(result, Exception):
+            continue  # One dead feed shouldn't sink the rest
+        headlines.extend(result[:max_per_feed])
+    try:
+        _save_feed_cache()
+    except OSError as e:
+        print(f"  Could not save feed cache: {e}")
     return headlines
 
 
+@functools.lru_cache(maxsize=1)
 def build_system_prompt():
-    """Build the system prompt that encodes personality."""
+    """Build the system prompt that encodes personality.
+    PERSONALITY is read-only, so the joined prompt is built once and reused for every tweet."""
     p = PERSONALITY
     views_section = ""
     if "views" in p:
@@ -227,16 +405,44 @@ Format: [tweet1, tweet2, tweet3, ...]""".format(
 }
 
 
-def generate_reply(tweet_text, tweet_author, context="mention"):
-    """Generate a smart reply to a tweet. Used for auto-reply engagement."""
-    client = get_ai_client()
+_WORD_RE = re.compile(r"[a-z']+")
+_HASHTAG_RE = re.compile(r"(?<!\w)#[A-Za-z_]\w*")  # "#1" is not a hashtag
+_MENTION_RE = re.compile(r"(?<!\w)@\w+")
+# Longest first so overlapping phrases report the most specific match
+_AVOID_PHRASE_RE = re.compile(
+    "|".join(re.escape(p) for p in sorted(AVOID_PHRASES, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
+def style_violation(text):
+    """Return why a generated tweet breaks the personality rules, or None if it's clean."""
+    hashtags = len(_HASHTAG_RE.findall(text))
+    if hashtags > MAX_HASHTAGS:
+        return f"has {hashtags} hashtag(s), max is {MAX_HASHTAGS}"
+    if _MENTION_RE.search(text):
+        return "tags an account"
+    if "http://" in text or "https://" in text:
+        return "contains a link (30-50% reach penalty)"
+    phrase = _AVOID_PHRASE_RE.search(text)
+    if phrase:
+        return f"uses banned phrase '{phrase.group(0)}'"
+    for word in _WORD_RE.findall(text.lower()):
+        if word in AVOID_WORDS:
+            return f"uses banned word '{word}'"
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def build_reply_system_prompt():
+    """System prompt for replies — like build_system_prompt, joined once and reused."""
     p = PERSONALITY
 
     views_text = ""
     if "views" in p:
         views_text = chr(10).join(f'- {v}' for v in p['views'])
 
-    system = f"""You are {p['name']}. You reply to tweets on X like a real person — short, edgy, funny.
+    return f"""You are {p['name']}. You reply to tweets on X like a real person — short, edgy, funny.
 
 YOUR VIEWS (dont contradict these):
 {views_text}
@@ -264,6 +470,12 @@ BAD REPLIES: "I agree, and human connection will also decline significantly.", "
 
 Just the reply text. Nothing else. SHORT."""
 
+
+def generate_reply(tweet_text, tweet_author, context="mention"):
+    """Generate a smart reply to a tweet. Used for auto-reply engagement."""
+    client = get_ai_client()
+    system = build_reply_system_prompt()
+
     if context == "mention":
         user_prompt = f"""Reply to this. Be short and real.
 
@@ -296,7 +508,6 @@ MAX 10 words. Just the reply text."""
                 temperature=0.85,
             )
         else:
-            import anthropic
             message = client.messages.create(
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=256,
@@ -315,10 +526,57 @@ MAX 10 words. Just the reply text."""
     return content[:MAX_TWEET_LENGTH]
 
 
-def fact_check_tweet(tweet_text, news_headlines=None):
-    """Verify a tweet for accuracy before posting. Returns (is_ok, reason)."""
-    client = get_ai_client()
+# Words that signal a claimed news event — one compiled pass instead of a loop of `in` checks
+_FABRICATION_RE = re.compile("|".join(re.escape(sig) for sig in (
+    "just announced", "just revealed", "just confirmed", "just dropped",
+    "just released", "breaking:", "just reported",
+)))
+
+
+# Content words for the local headline screen — 4+ chars, minus filler and the signal words themselves
+_TOKEN_RE = re.compile(r"[a-z0-9$][a-z0-9$'.-]{2,}[a-z0-9]")
+_FILLER_TOKENS = frozenset((
+    "just", "announced", "revealed", "confirmed", "dropped", "released", "reported", "breaking",
+    "that", "this", "with", "from", "have", "will", "they", "their", "about", "after", "into",
+    "over", "what", "when", "been", "more", "than", "were", "says", "said", "news",
+))
+
+
+def _content_tokens(text):
+    return frozenset(_TOKEN_RE.findall(text.lower())) - _FILLER_TOKENS
+
+
+@functools.lru_cache(maxsize=8)
+def _headline_token_sets(headline_texts):
+    """Token set per headline (title + summary), built once per fetched headline list."""
+    return tuple(_content_tokens(text) for text in headline_texts)
+
+
+def _overlaps_headline(tweet_text, news_headlines):
+    """True when the tweet shares at least one content word with some headline. Only a
+    negative answer is conclusive — sharing nouns with a story says nothing about the claim."""
+    tokens = _content_tokens(tweet_text)
+    if not isinstance(news_headlines, Headlines):
+        news_headlines = Headlines(news_headlines)
+    return any(not tokens.isdisjoint(headline) for headline in _headline_token_sets(news_headlines.texts))
+
+
+# Headline verdicts for a repeated claim (same text up to case and spacing) against the same
+# headlines reuse the verdict instead of another LLM call. Exact repeats only — a near match
+# can differ by one negation, number or company name, and a cached PASS would approve it.
+# Tweet completions themselves are never reused: that would post duplicate tweets.
+_FACT_CHECK_CACHE = SemanticCache(FACT_CHECK_CACHE_FILE, semantic=False)
 
+
+def _headlines_context(news_headlines):
+    if not isinstance(news_headlines, Headlines):
+        news_headlines = Headlines(news_headlines)
+    return news_headlines.context
+
+
+def _local_fact_check(tweet_text, news_headlines):
+    """Every check that needs no LLM call. Returns (is_ok, reason), or None when only the
+    LLM headline check can decide."""
     # Simple rule-based checks first (no AI needed)
     text_lower = tweet_text.lower()
 
@@ -338,25 +596,55 @@ def fact_check_tweet(tweet_text, news_headlines=None):
             return False, reason
 
     # Check for fabricated events (words that signal fake news claims)
-    fabrication_signals = [
-        "just announced", "just revealed", "just confirmed", "just dropped",
-        "just released", "breaking:", "just reported",
-    ]
-    has_fabrication = any(sig in text_lower for sig in fabrication_signals)
+    fabrication = _FABRICATION_RE.search(text_lower)
 
     # If no fabrication signals, it's likely an opinion/observation — pass it
-    if not has_fabrication:
+    if not fabrication:
         return True, "opinion/observation"
 
     # Has fabrication signal — needs headline verification
     if not news_headlines:
         # No headlines to verify against, reject fabricated claims
-        matched_signal = next(sig for sig in fabrication_signals if sig in text_lower)
-        return False, f"Claims '{matched_signal}' but no headlines to verify"
+        return False, f"Claims '{fabrication.group(0)}' but no headlines to verify"
 
-    # Check against real headlines using AI
-    headlines_context = "\n".join(f"- {h['title']}" for h in news_headlines[:15])
+    # About none of the fetched headlines — nothing could back the claim, no need to ask the LLM
+    if not _overlaps_headline(tweet_text, news_headlines):
+        return False, f"Claims '{fabrication.group(0)}' but matches no headline"
+
+    cached = _FACT_CHECK_CACHE.get(tweet_text, context=_headlines_context(news_headlines))
+    if cached is not None:
+        return tuple(cached)
+    return None
+
+
+def _ask_fact_checker(client, prompt, max_tokens):
+    """Send a fact-check prompt to the cheap model and return its raw answer."""
+    if AI_PROVIDER == "groq":
+        # Use smaller model for fact-checking to save tokens
+        return groq_call_with_retry(
+            client,
+            GROQ_FALLBACK_MODEL,  # Use cheap model for fact-checks
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=0.1,
+        )
+    message = client.messages.create(
+        model="claude-sonnet-4-5-20250929",
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    return message.content[0].text.strip()
+
+
+def fact_check_tweet(tweet_text, news_headlines=None, client=None):
+    """Verify a tweet for accuracy before posting. Returns (is_ok, reason)."""
+    local = _local_fact_check(tweet_text, news_headlines)
+    if local is not None:
+        return local
 
+    # Check against real headlines using AI
+    client = client or get_ai_client()
+    headlines_context = _headlines_context(news_headlines)
     check_prompt = f"""Does this tweet claim match any of the real headlines below?
 
 Tweet: "{tweet_text}"
@@ -370,29 +658,14 @@ If the tweet claims something NOT in any headline, say FAIL.
 Answer PASS or FAIL on line 1, reason on line 2."""
 
     try:
-        if AI_PROVIDER == "groq":
-            # Use smaller model for fact-checking to save tokens
-            result = groq_call_with_retry(
-                client,
-                GROQ_FALLBACK_MODEL,  # Use cheap model for fact-checks
-                messages=[{"role": "user", "content": check_prompt}],
-                max_tokens=100,
-                temperature=0.1,
-            )
-        else:
-            import anthropic
-            message = client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=100,
-                messages=[{"role": "user", "content": check_prompt}],
-            )
-            result = message.content[0].text.strip()
+        result = _ask_fact_checker(client, check_prompt, max_tokens=48)  # PASS/FAIL + one short reason
 
         lines = result.split("\n", 1)
         verdict = lines[0].strip().upper()
         reason = lines[1].strip() if len(lines) > 1 else ""
 
         is_ok = "PASS" in verdict
+        _FACT_CHECK_CACHE.put(tweet_text, (is_ok, reason), context=headlines_context)
         return is_ok, reason
     except Exception as e:
         # If fact-check itself fails (rate limit etc), let the tweet through
@@ -401,9 +674,105 @@ Answer PASS or FAIL on line 1, reason on line 2."""
         return True, "fact-check unavailable"
 
 
-def generate_tweet(category, news_context=None, max_retries=3):
-    """Generate a single tweet or thread for the given category. Includes fact-checking."""
-    client = get_ai_client()
+def fact_check_batch(tweets, news_headlines=None, client=None):
+    """Fact-check several tweets with at most one LLM call. Returns [(is_ok, reason), ...] in order.
+    Falls back to one fact_check_tweet per tweet if the model's JSON can't be parsed."""
+    results = [_local_fact_check(text, news_headlines) for text in tweets]
+    pending = [i for i, verdict in enumerate(results) if verdict is None]
+    if len(pending) == 1:
+        results[pending[0]] = fact_check_tweet(tweets[pending[0]], news_headlines, client=client)
+    if len(pending) < 2:
+        return results
+
+    client = client or get_ai_client()
+    headlines_context = _headlines_context(news_headlines)
+    numbered = "\n".join(f'{n}. "{tweets[i]}"' for n, i in enumerate(pending, 1))
+    check_prompt = f"""For each numbered tweet, does its claim match any of the real headlines below?
+
+Tweets:
+{numbered}
+
+Real headlines:
+{headlines_context}
+
+PASS if the tweet specific claim is supported by a headline, FAIL if it claims something NOT in any headline.
+
+Return ONLY a JSON array, one object per tweet: [{{"index": 1, "verdict": "PASS", "reason": "..."}}]"""
+
+    try:
+        answer = _ask_fact_checker(client, check_prompt, max_tokens=48 * len(pending))
+        verdicts = loads(answer[answer.index("["):answer.rindex("]") + 1])
+        for item in verdicts:
+            n = int(item["index"])
+            if not 1 <= n <= len(pending):
+                continue
+            i = pending[n - 1]
+            is_ok = str(item.get("verdict", "")).upper() == "PASS"
+            results[i] = (is_ok, str(item.get("reason", "")))
+            _FACT_CHECK_CACHE.put(tweets[i], results[i], context=headlines_context)
+    except Exception as e:
+        print(f"  [FACT-CHECK] batch check failed ({e}), checking one by one")
+
+    for i in pending:
+        if results[i] is None:
+            results[i] = fact_check_tweet(tweets[i], news_headlines, client=client)
+    return results
+
+
+def _complete_tweet(client, system, user_prompt, thread=False):
+    """One LLM completion for a tweet prompt, with wrapping quotes stripped.
+    A single tweet never needs more than ~128 tokens, so only threads get the full budget."""
+    max_tokens = 1024 if thread else 128
+    if AI_PROVIDER == "groq":
+        content = groq_call_with_retry(
+            client,
+            GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.9,
+            # Output is truncated to MAX_TWEET_LENGTH — stop paying for tokens past that
+            stop_after=None if thread else MAX_TWEET_LENGTH + 40,
+        )
+    else:
+        message = client.messages.create(
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=max_tokens,
+            system=system,
+            messages=[{"role": "user", "content": user_prompt}],
+        )
+        content = message.content[0].text.strip()
+
+    # Strip quotes if the model wrapped the tweet in them
+    if content.startswith('"') and content.endswith('"'):
+        content = content[1:-1]
+    return content
+
+
+# Speculative next candidates, generated while the current one is being fact-checked
+_SPECULATE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculate")
+
+
+def _thread_tweets(content):
+    """The tweets of a thread completion (a JSON array of strings), or None when it isn't one."""
+    try:
+        tweets = loads(content)
+    except ValueError:
+        return None
+    if isinstance(tweets, list) and tweets and all(isinstance(t, str) for t in tweets):
+        return tweets
+    return None
+
+
+def generate_tweet(category, news_context=None, max_retries=3, client=None, defer_fact_check=False):
+    """Generate a single tweet or thread for the given category. Includes fact-checking.
+    Pass client to share one connection pool across calls (see generate_batch).
+    With defer_fact_check, a candidate that needs the LLM headline check is returned
+    unchecked and flagged "_needs_fact_check" so the caller can batch those checks.
+    Raises RuntimeError when every attempt breaks the style or fact-check rules."""
+    client = client or get_ai_client()
     system = build_system_prompt()
 
     user_prompt = CATEGORY_PROMPTS.get(category, CATEGORY_PROMPTS["hot_take"])
@@ -421,36 +790,39 @@ def generate_tweet(category, news_context=None, max_retries=3):
     if category == "thread":
         user_prompt += "\nReturn ONLY a JSON array of tweet strings."
 
+    # Fact-check (skip for opinion-only categories)
+    skip_check = category in ("thought_question", "philosophical", "spirituality", "engagement_post", "thread")
+    thread = category == "thread"
+    next_candidate = None  # Future from _SPECULATE_POOL, consumed by the next attempt
+
     for attempt in range(max_retries):
-        if AI_PROVIDER == "groq":
-            content = groq_call_with_retry(
-                client,
-                GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user_prompt},
-                ],
-                max_tokens=1024,
-                temperature=0.9,
-            )
+        if next_candidate is not None:
+            content = next_candidate.result()
+            next_candidate = None
         else:
-            import anthropic
-            message = client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=1024,
-                system=system,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            content = message.content[0].text.strip()
-
-        # Strip quotes if the model wrapped the tweet in them
-        if content.startswith('"') and content.endswith('"'):
-            content = content[1:-1]
+            content = _complete_tweet(client, system, user_prompt, thread)
+
+        # Cheap local style check before spending an LLM call on fact-checking — per tweet
+        # as posted, so a thread is parsed first rather than checked as its raw JSON
+        tweets = _thread_tweets(content) if thread else None
+        violation = next(filter(None, map(style_violation, tweets or (content,))), None)
+        if violation:
+            print(f"  [STYLE FAIL] attempt {attempt+1}: {violation}")
+            user_prompt += f"\n\nYOUR PREVIOUS TWEET BROKE THE STYLE RULES: {violation}\nWrite a different tweet."
+            continue
 
-        # Fact-check (skip for opinion-only categories)
-        skip_check = category in ("thought_question", "philosophical", "spirituality", "engagement_post")
-        if not skip_check and category != "thread":
-            is_ok, reason = fact_check_tweet(content, news_context)
+        if not skip_check:
+            local = _local_fact_check(content, news_context)
+            if local is None:
+                if defer_fact_check:
+                    return {"type": "single", "text": content[:MAX_TWEET_LENGTH], "_needs_fact_check": True}
+                # Only the remote headline check costs an LLM round-trip — overlap it with the
+                # next generation so a FAIL already has a replacement in flight
+                if attempt < max_retries - 1:
+                    next_candidate = _SPECULATE_POOL.submit(_complete_tweet, client, system, user_prompt, thread)
+                is_ok, reason = fact_check_tweet(content, news_context, client=client)
+            else:
+                is_ok, reason = local
             if not is_ok:
                 print(f"  [FACT-CHECK FAIL] attempt {attempt+1}: {reason}")
                 print(f"  [REJECTED] {content[:80]}...")
@@ -458,22 +830,18 @@ def generate_tweet(category, news_context=None, max_retries=3):
                 user_prompt += f"\n\nYOUR PREVIOUS TWEET FAILED FACT-CHECK: {reason}\nWrite a different tweet. Use OPINIONS and OBSERVATIONS, not fabricated claims."
                 continue
             else:
+                if next_candidate is not None:
+                    next_candidate.cancel()  # Passed — the speculative candidate isn't needed
+                    next_candidate = None
                 print(f"  [FACT-CHECK PASS] {content[:60]}...")
 
-        if category == "thread":
-            try:
-                tweets = json.loads(content)
-                if isinstance(tweets, list):
-                    return {"type": "thread", "tweets": [t[:MAX_TWEET_LENGTH] for t in tweets]}
-            except json.JSONDecodeError:
-                pass
-            return {"type": "single", "text": content[:MAX_TWEET_LENGTH]}
-
-        return {"type": "single", "text": content[:MAX_TWEET_LENGTH]}
+        if tweets is not None:
+            return {"type": "thread", "tweets": [t[:MAX_TWEET_LENGTH] for t in tweets]}
+        return {"type": "single", "text": content[:MAX_TWEET_LENGTH]}  # Not a JSON thread — post it as a single tweet
 
-    # If all retries failed, return last attempt anyway (better than nothing)
-    print(f"  [WARNING] All {max_retries} attempts failed fact-check, using last attempt")
-    return {"type": "single", "text": content[:MAX_TWEET_LENGTH]}
+    # Never post an attempt that broke the rules — the caller skips this slot instead
+    print(f"  [WARNING] All {max_retries} attempts failed checks, skipping")
+    raise RuntimeError(f"All {max_retries} attempts failed checks")
 
 
 def generate_news_take(news_item):
@@ -507,7 +875,6 @@ Under 250 characters (leave room for link in reply). Just the tweet text, no quo
                 temperature=0.9,
             )
         else:
-            import anthropic
             message = client.messages.create(
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=256,
@@ -533,25 +900,59 @@ Under 250 characters (leave room for link in reply). Just the tweet text, no quo
         return None
 
 
+async def _generate_all(jobs, news, defer_fact_check=False):
+    """Run every generation at once — the batch takes as long as the slowest tweet, not the sum.
+    The SDK clients are blocking, so each job runs in a worker thread sharing one client."""
+    client = get_ai_client()
+    return await asyncio.gather(
+        *(
+            asyncio.to_thread(generate_tweet, category, news, client=client, defer_fact_check=defer_fact_check)
+            for category in jobs
+        ),
+        return_exceptions=True,
+    )
+
+
 def generate_batch(categories=None, count_per_category=1):
     """Generate a batch of content for multiple categories."""
     if categories is None:
         categories = list(CATEGORY_PROMPTS.keys())
 
     news = fetch_news_headlines()
+    jobs = [category for category in categories for _ in range(count_per_category)]
     generated = []
-
-    for category in categories:
-        for _ in range(count_per_category):
-            try:
-                result = generate_tweet(category, news_context=news)
-                result["category"] = category
-                result["generated_at"] = datetime.now(timezone.utc).isoformat()
-                result["posted"] = False
-                generated.append(result)
-                print(f"  Generated: [{category}] {result.get('text', result.get('tweets', [''])[0])[:60]}...")
-            except Exception as e:
-                print(f"  Error generating {category}: {e}")
+    results = _run_async(_generate_all(jobs, news, defer_fact_check=True))
+
+    # One LLM call checks every candidate the local rules couldn't decide
+    pending = []
+    for i, result in enumerate(results):
+        if isinstance(result, dict) and result.pop("_needs_fact_check", False):
+            pending.append(i)
+    if pending:
+        verdicts = fact_check_batch([results[i]["text"] for i in pending], news)
+        retry = []
+        for i, (is_ok, reason) in zip(pending, verdicts):
+            if is_ok:
+                print(f"  [FACT-CHECK PASS] {results[i]['text'][:60]}...")
+            else:
+                print(f"  [FACT-CHECK FAIL] {reason}")
+                print(f"  [REJECTED] {results[i]['text'][:80]}...")
+                retry.append(i)
+        # Rejected ones get regenerated with the normal per-tweet check
+        if retry:
+            redone = _run_async(_generate_all([jobs[i] for i in retry], news))
+            for i, result in zip(retry, redone):
+                results[i] = result
+
+    for category, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print(f"  Error generating {category}: {result}")
+            continue
+        result["category"] = category
+        result["generated_at"] = datetime.now(timezone.utc).isoformat()
+        result["posted"] = False
+        generated.append(result)
+        print(f"  Generated: [{category}] {result.get('text', result.get('tweets', [''])[0])[:60]}...")
 
     return generated
 
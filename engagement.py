@@ -8,20 +8,20 @@ This is the #1 growth lever per X's algorithm:
 STRATEGY: Only reply where it makes sense for our brand.
 Don't engage with random off-topic conversations.
 """
-import json
+import asyncio
+import bisect
+import functools
+import os
+import re
+import threading
 import time
 import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from pathlib import Path
-
-import tweepy
 
 from config import (
-    X_API_KEY,
-    X_API_SECRET,
-    X_ACCESS_TOKEN,
-    X_ACCESS_TOKEN_SECRET,
-    X_BEARER_TOKEN,
+    CFG,
     AUTO_FOLLOW_BACK,
     AUTO_REPLY_TO_MENTIONS,
     PROACTIVE_REPLY,
@@ -29,208 +29,494 @@ from config import (
     MAX_PROACTIVE_REPLIES_PER_HOUR,
     ENGAGE_WITH_ACCOUNTS,
     ENGAGE_TOPICS,
+    ENGAGEMENT_COUNTS_FILE,
     ENGAGEMENT_LOG_FILE,
+    ENGAGEMENT_LOG_PATH,
+    LEGACY_ENGAGEMENT_LOG_FILE,
 )
 from content_generator import generate_reply
-
-
-def get_client():
-    """Create authenticated tweepy Client for X API v2."""
-    return tweepy.Client(
-        bearer_token=X_BEARER_TOKEN,
-        consumer_key=X_API_KEY,
-        consumer_secret=X_API_SECRET,
-        access_token=X_ACCESS_TOKEN,
-        access_token_secret=X_ACCESS_TOKEN_SECRET,
-        wait_on_rate_limit=True,  # Let tweepy handle 429s gracefully
-    )
+from poster import get_client, get_identity
+from storage import append_record, dumps, iter_records, loads, rewrite_records, write_atomic
 
 
 # Track X API usage to avoid hitting limits and blocking
-_api_call_times = []
+# Sliding window, oldest call on the left — expiring stale calls is popleft, not a rebuild
+_api_call_times = deque()
+_api_lock = threading.Lock()  # Engagement phases run concurrently and share the budget
 MAX_API_CALLS_PER_15MIN = 45  # Stay under X's 50/15min limit
 
 
 def check_api_budget():
     """Check if we have API budget left. Returns True if OK to call."""
-    global _api_call_times
     cutoff = time.time() - 900  # 15 minutes
-    _api_call_times = [t for t in _api_call_times if t > cutoff]
-    return len(_api_call_times) < MAX_API_CALLS_PER_15MIN
+    with _api_lock:
+        while _api_call_times and _api_call_times[0] <= cutoff:
+            _api_call_times.popleft()
+        return len(_api_call_times) < MAX_API_CALLS_PER_15MIN
+
+
+def reserve_api_call():
+    """Check the budget and record the call in one step — concurrent phases can't all pass
+    the check and then overshoot together. Returns False when the budget is spent."""
+    now = time.time()
+    with _api_lock:
+        while _api_call_times and _api_call_times[0] <= now - 900:
+            _api_call_times.popleft()
+        if len(_api_call_times) >= MAX_API_CALLS_PER_15MIN:
+            return False
+        _api_call_times.append(now)
+        return True
 
 
-def track_api_call():
-    """Record an API call."""
-    _api_call_times.append(time.time())
+class RateBucket:
+    """Token bucket for one endpoint family — paces calls by waiting only as long as needed.
+    The 45/15min budget above stays the hard cap; buckets just spread calls out under it."""
 
+    JITTER = (0.2, 0.8)  # Small human-looking pause when a token was already waiting
 
-def load_engagement_log():
-    """Load engagement log from disk."""
-    log_file = Path(ENGAGEMENT_LOG_FILE)
-    if log_file.exists():
-        try:
-            return json.loads(log_file.read_text())
-        except json.JSONDecodeError:
-            pass
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping for exactly the refill time if none is left."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_per_sec)
+            self.last_refill = now
+            self.tokens -= 1  # Reserve now, so concurrent phases queue up instead of racing
+            wait = -self.tokens / self.refill_per_sec if self.tokens < 0 else 0
+        time.sleep(wait or random.uniform(*self.JITTER))
+
+
+# Sustained rates follow X's per-user limits per 15 minutes; capacity is the allowed burst
+create_tweet_bucket = RateBucket(capacity=3, refill_per_sec=100 / 900)  # POST /2/tweets
+follow_bucket = RateBucket(capacity=3, refill_per_sec=50 / 900)  # POST /2/users/:id/following
+mentions_bucket = RateBucket(capacity=5, refill_per_sec=180 / 900)  # GET /2/users/:id/mentions
+search_bucket = RateBucket(capacity=5, refill_per_sec=180 / 900)  # GET /2/tweets/search/recent
+
+
+# The engagement log on disk is a stream of {"kind", "entry"} events, one per line.
+# Saving appends only what changed since load; the file is rewritten (compacted)
+# when lists were trimmed or it grows past ENGAGEMENT_COMPACT_BYTES.
+_LOG_LISTS = ("followed_back", "replies_sent", "proactive_replies")
+_LOG_SCALARS = ("last_mention_id", "following")  # Latest event wins
+ENGAGEMENT_COMPACT_BYTES = 5 * 1024 * 1024
+ENGAGEMENT_RETENTION_DAYS = 30  # Recency checks only look back hours, dedup a few days
+FOLLOWING_REFRESH_HOURS = 6  # How long the saved snapshot of accounts we follow is trusted
+
+
+def _empty_log():
     return {
-        "last_mention_id": None,
-        "followed_back": [],
-        "replies_sent": [],
-        "proactive_replies": [],
+        "last_mention_id": None, "following": None,
+        "followed_back": [], "replies_sent": [], "proactive_replies": [],
     }
 
 
+def _log_events(log):
+    """Flatten an in-memory log into the events that rebuild it."""
+    for kind in _LOG_SCALARS:
+        if log.get(kind):
+            yield {"kind": kind, "entry": log[kind]}
+    for kind in _LOG_LISTS:
+        for entry in log.get(kind, []):
+            yield {"kind": kind, "entry": entry}
+
+
+def _saved_state(log):
+    """What's on disk for log — compared on save to find the new tail of each list."""
+    state = {kind: len(log.get(kind, [])) for kind in _LOG_LISTS}
+    for kind in _LOG_SCALARS:
+        state[kind] = log.get(kind)
+    return state
+
+
+@functools.lru_cache(maxsize=1)
+def _migrate_engagement_log():
+    """Convert the old single-JSON-object log to events once. Keeps the old file as .bak."""
+    legacy = LEGACY_ENGAGEMENT_LOG_FILE
+    if ENGAGEMENT_LOG_FILE.exists() or not legacy.exists():
+        return
+    try:
+        old = loads(legacy.read_bytes())
+    except ValueError:
+        old = _empty_log()
+    rewrite_records(ENGAGEMENT_LOG_PATH, _log_events(old))
+    legacy.rename(legacy.with_name(legacy.name + ".bak"))
+
+
+def load_engagement_log():
+    """Load engagement log from disk by replaying its events."""
+    _migrate_engagement_log()
+    log = _empty_log()
+    for event in iter_records(ENGAGEMENT_LOG_PATH):
+        kind = event.get("kind")
+        if kind in _LOG_SCALARS:
+            log[kind] = event["entry"]
+        elif kind in _LOG_LISTS:
+            log[kind].append(event["entry"])
+    log["_saved"] = _saved_state(log)
+    _index_replies(log)
+    return log
+
+
+def _trim_replies(log, cutoff):
+    """Drop replies at or before the ISO cutoff. Entries are appended in time order,
+    so the cut point is a bisect and the trim is one in-place slice delete."""
+    for key in ("replies_sent", "proactive_replies"):
+        entries = log.get(key, [])
+        del entries[:bisect.bisect_right(entries, cutoff, key=lambda entry: entry.get("timestamp", ""))]
+
+
+def compact_engagement_log(log):
+    """Rewrite the event log from log, dropping replies older than ENGAGEMENT_RETENTION_DAYS."""
+    _trim_replies(log, (datetime.now(timezone.utc) - timedelta(days=ENGAGEMENT_RETENTION_DAYS)).isoformat())
+    rewrite_records(ENGAGEMENT_LOG_PATH, _log_events(log))
+    _index_replies(log)
+
+
 def save_engagement_log(log):
-    """Save engagement log to disk."""
-    Path(ENGAGEMENT_LOG_FILE).write_text(json.dumps(log, indent=2))
+    """Save engagement log to disk — appends only the entries added since load.
+    Holds _log_lock, so phases sharing the log can't append while it's diffed or compacted."""
+    with _log_lock:
+        _save_engagement_log(log)
+
+
+def _save_engagement_log(log):
+    saved = log.get("_saved")
+    try:
+        oversized = os.path.getsize(ENGAGEMENT_LOG_PATH) > ENGAGEMENT_COMPACT_BYTES
+    except OSError:
+        oversized = False
+    if saved is None or oversized or any(len(log.get(k, [])) < saved[k] for k in _LOG_LISTS):
+        compact_engagement_log(log)
+    else:
+        for kind in _LOG_SCALARS:
+            if log.get(kind) != saved.get(kind):
+                append_record(ENGAGEMENT_LOG_PATH, {"kind": kind, "entry": log[kind]})
+        for kind in _LOG_LISTS:
+            for entry in log.get(kind, [])[saved[kind]:]:
+                append_record(ENGAGEMENT_LOG_PATH, {"kind": kind, "entry": entry})
+    new_state = _saved_state(log)
+    if new_state != saved:
+        _save_counts(log)
+    log["_saved"] = new_state
+
+
+def _save_counts(log):
+    """Refresh the sidecar of list sizes that `run.py stats` reads instead of replaying the log."""
+    try:
+        write_atomic(ENGAGEMENT_COUNTS_FILE, dumps({kind: len(log.get(kind, [])) for kind in _LOG_LISTS}))
+    except OSError as e:
+        print(f"  Could not save engagement counts: {e}")
 
 
 def get_all_replied_tweet_ids(log):
     """Get ALL tweet IDs we have ever replied to — across mentions, proactive, topic, viral.
-    This is the single source of truth to prevent double-replying."""
-    ids = set()
-    for r in log.get("replies_sent", []):
-        ids.add(r.get("tweet_id", ""))
-    for r in log.get("proactive_replies", []):
-        ids.add(r.get("tweet_id", ""))
-    ids.discard("")
-    return ids
+    This is the single source of truth to prevent double-replying.
+    Returns the live set kept current by record_reply()."""
+    if "_replied_tweet_ids" not in log:
+        _index_replies(log)
+    return log["_replied_tweet_ids"]
+
+
+# Reply lists carry the other account under different keys
+_AUTHOR_KEYS = (("replies_sent", "author"), ("proactive_replies", "target"))
+
+
+def _index_replies(log):
+    """Build the in-memory indexes (underscore keys never reach disk):
+    _author_index: author_lower -> latest reply timestamp, _reply_times: sorted timestamps
+    (_proactive_times: the proactive ones alone),
+    _replied_tweet_ids / _followed_back_set: O(1) membership for the dedup checks."""
+    author_index = {}
+    reply_times = []
+    replied_ids = set()
+    for kind, key in _AUTHOR_KEYS:
+        for entry in log.get(kind, []):
+            ts = entry.get("timestamp", "")
+            author = entry.get(key, "").lower()
+            if ts > author_index.get(author, ""):
+                author_index[author] = ts
+            reply_times.append(ts)
+            replied_ids.add(entry.get("tweet_id", ""))
+    reply_times.sort()
+    replied_ids.discard("")
+    proactive_times = sorted(entry.get("timestamp", "") for entry in log.get("proactive_replies", []))
+    # Refilled in place on a rebuild (e.g. after compaction) — phases sharing the log may hold
+    # these very objects, and a fresh one would leave them checking a stale copy
+    with _log_lock:
+        _refill(log, "_proactive_times", proactive_times)
+        _refill(log, "_author_index", author_index)
+        _refill(log, "_reply_times", reply_times)
+        _refill(log, "_replied_tweet_ids", replied_ids)
+        _refill(log, "_followed_back_set", set(log.get("followed_back", [])))
+
+
+def _refill(log, key, fresh):
+    """Make log[key] hold fresh's contents, keeping the existing container when there is one."""
+    current = log.get(key)
+    if current is None:
+        log[key] = fresh
+    elif isinstance(current, list):
+        current[:] = fresh
+    else:
+        current.clear()
+        current.update(fresh)
+
+
+# Guards log mutations and index reads while the engagement phases share one log
+_log_lock = threading.RLock()
+
+
+def record_reply(log, kind, entry):
+    """Append a reply to log[kind] ("replies_sent" or "proactive_replies") and keep the indexes current."""
+    with _log_lock:
+        log[kind].append(entry)
+        if "_author_index" not in log:
+            _index_replies(log)
+            return
+        ts = entry.get("timestamp", "")
+        author = entry.get(dict(_AUTHOR_KEYS)[kind], "").lower()
+        if ts > log["_author_index"].get(author, ""):
+            log["_author_index"][author] = ts
+        bisect.insort(log["_reply_times"], ts)
+        if kind == "proactive_replies":
+            bisect.insort(log["_proactive_times"], ts)
+        if entry.get("tweet_id"):
+            log["_replied_tweet_ids"].add(entry["tweet_id"])
+
+
+def record_follow(log, user_id):
+    """Mark user_id as handled by follow-back (followed, or skipped as spam)."""
+    with _log_lock:
+        log["followed_back"].append(user_id)
+        if "_followed_back_set" in log:
+            log["_followed_back_set"].add(user_id)
+        else:
+            _index_replies(log)
 
 
 def recently_replied_to_author(log, author_username, hours=6):
     """Check if we already replied to this author in the last N hours.
     Prevents spamming the same person with multiple replies."""
+    if "_author_index" not in log:
+        _index_replies(log)
     cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-    author_lower = author_username.lower()
-
-    for r in log.get("replies_sent", []):
-        if r.get("author", "").lower() == author_lower and r.get("timestamp", "") > cutoff:
-            return True
-    for r in log.get("proactive_replies", []):
-        if r.get("target", "").lower() == author_lower and r.get("timestamp", "") > cutoff:
-            return True
-    return False
+    with _log_lock:
+        return log["_author_index"].get(author_username.lower(), "") > cutoff
 
 
 def get_replies_this_hour(log):
     """Count how many replies we've sent in the last hour."""
+    if "_reply_times" not in log:
+        _index_replies(log)
     one_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
-    count = 0
-    for entry in log.get("replies_sent", []):
-        if entry.get("timestamp", "") > one_hour_ago:
-            count += 1
-    for entry in log.get("proactive_replies", []):
-        if entry.get("timestamp", "") > one_hour_ago:
-            count += 1
-    return count
+    with _log_lock:
+        times = log["_reply_times"]
+        return len(times) - bisect.bisect_right(times, one_hour_ago)
+
+
+def reserve_reply(log, tweet_id, author=None):
+    """Claim a reply to tweet_id (and, given author, to that account) right before sending it.
+    The checks and the claim happen under one lock, and replies still in flight count too —
+    so concurrent phases can neither overshoot MAX_REPLIES_PER_HOUR nor both reply to the same
+    tweet or author. Always hand the claim back with release_reply(); once sent, record_reply()
+    remembers it."""
+    with _log_lock:
+        pending = log.setdefault("_pending_replies", {})  # tweet_id -> author (lowercase) or None
+        if get_replies_this_hour(log) + len(pending) >= MAX_REPLIES_PER_HOUR:
+            return False
+        if tweet_id in pending or tweet_id in get_all_replied_tweet_ids(log):
+            return False
+        if author is not None:
+            author = author.lower()
+            if author in pending.values() or recently_replied_to_author(log, author):
+                return False
+        pending[tweet_id] = author
+        return True
+
+
+def release_reply(log, tweet_id):
+    with _log_lock:
+        log["_pending_replies"].pop(tweet_id, None)
+
+
+def get_proactive_replies_this_hour(log):
+    """Count how many proactive (non-mention) replies we've sent in the last hour."""
+    if "_proactive_times" not in log:
+        _index_replies(log)
+    one_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    with _log_lock:
+        times = log["_proactive_times"]
+        return len(times) - bisect.bisect_right(times, one_hour_ago)
+
+
+# ENGAGE_TOPICS compiled once into one case-insensitive alternation (longest phrase wins)
+_ENGAGE_RE = re.compile(
+    "|".join(re.escape(t) for t in sorted(ENGAGE_TOPICS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
+def matches_topic(text):
+    """Return the ENGAGE_TOPICS phrase mentioned in text, or None."""
+    match = _ENGAGE_RE.search(text)
+    return match.group(0) if match else None
+
+
+def _compile_any(phrases):
+    """One regex alternation that finds any of the phrases — a single scan of the text."""
+    return re.compile("|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)))
+
+
+# Our topics — only engage if the mention touches these
+_ON_TOPIC_RE = _compile_any((
+    "elon", "tesla", "spacex", "starship", "fsd", "cybertruck", "optimus",
+    "xai", "grok", "neuralink", "boring company", "doge",
+    "bittensor", "tao", "subnet", "decentralized ai", "deai", "miner",
+    "ai", "artificial intelligence", "machine learning", "llm", "chatgpt",
+    "openai", "claude", "anthropic", "google", "gemini",
+    "tech", "startup", "silicon valley", "nvidia", "gpu",
+    "space", "mars", "rocket", "orbit", "nasa",
+    "crypto", "bitcoin", "blockchain", "web3",
+    "science", "physics", "quantum", "consciousness",
+    "philosophy", "meditation", "spirituality", "simulation",
+    "politics", "geopolitics",
+))
+
+# Known bot usernames
+_BOT_NAMES = frozenset((
+    "grok", "xbot", "autobot", "tweetbot", "chatgpt",
+    "eliza_bot", "botly", "autopilot",
+))
+# Bot patterns in username
+_BOT_PATTERN_RE = _compile_any(("_bot", "bot_", "airdrop", "nft_", "_nft", "crypto_signal"))
+# Pattern: "Musk" or "Elon" in username + random numbers/letters
+_ELON_PATTERN_RE = _compile_any((
+    "musk", "elon", "tesla_ceo", "spacex_ceo",
+    "doge_", "_doge", "dogefather",
+))
+_REAL_ELON_ACCOUNTS = frozenset(("elonmusk", "cb_doge", "dogedesigner"))
+
+
+def _digit_tail_len(s):
+    """Length of the run of digits at the end of s."""
+    i = len(s)
+    while i and s[i - 1].isdigit():
+        i -= 1
+    return len(s) - i
+
+
+def _has_caps_then_digits(s, caps=2, digits=3):
+    """True if s has `caps`+ uppercase letters directly followed by `digits`+ digits — one pass."""
+    caps_run = digit_run = 0
+    for ch in s:
+        if ch.isdigit():
+            if caps_run >= caps or digit_run:
+                digit_run += 1
+                if digit_run >= digits:
+                    return True
+            caps_run = 0
+        else:
+            digit_run = 0
+            caps_run = caps_run + 1 if ch.isupper() else 0
+    return False
+
+
+# Spam content signals
+_SPAM_SIGNALS = (
+    "free", "airdrop", "claim", "giveaway", "dm me", "send",
+    "won", "winner", "congratulations", "click here", "earn",
+    "money", "profit", "investment", "guaranteed", "100x",
+    "join now", "limited time", "act fast", "crypto signal",
+    "whitelist", "presale", "nft drop", "check dm",
+    "follow me", "follow back", "f4f", "promo",
+    "telegram", "whatsapp", "discord link",
+    # Elon scam signals
+    "elon is giving", "musk is sending", "free tesla",
+    "elon endorsed", "musk foundation",
+)
+# Flattery/scam pattern: overly effusive praise to get engagement
+_FLATTERY_SIGNALS = (
+    "you are amazing", "love your content", "great work sir",
+    "my friend i will", "nice to meet you", "hello friend",
+    "bless you", "god bless",
+)
+# Both lists in one alternation — a single scan of the text finds any signal
+_SPAM_TEXT_RE = _compile_any(_SPAM_SIGNALS + _FLATTERY_SIGNALS)
 
 
 def is_on_topic(text):
     """Check if a mention/reply is related to our topics. Skip off-topic stuff."""
-    text_lower = text.lower()
-    # Our topics — only engage if the mention touches these
-    on_topic_signals = [
-        "elon", "tesla", "spacex", "starship", "fsd", "cybertruck", "optimus",
-        "xai", "grok", "neuralink", "boring company", "doge",
-        "bittensor", "tao", "subnet", "decentralized ai", "deai", "miner",
-        "ai", "artificial intelligence", "machine learning", "llm", "chatgpt",
-        "openai", "claude", "anthropic", "google", "gemini",
-        "tech", "startup", "silicon valley", "nvidia", "gpu",
-        "space", "mars", "rocket", "orbit", "nasa",
-        "crypto", "bitcoin", "blockchain", "web3",
-        "science", "physics", "quantum", "consciousness",
-        "philosophy", "meditation", "spirituality", "simulation",
-        "politics", "geopolitics",
-    ]
-    return any(sig in text_lower for sig in on_topic_signals)
+    if matches_topic(text):
+        return True
+    return _ON_TOPIC_RE.search(text.lower()) is not None
 
 
 def is_spam_or_bot(username, text):
     """Check if mention is spam, bot, scam, or Elon impersonator."""
-    uname = username.lower()
+    return _is_spam(username, text.lower())
 
-    # Known bot usernames
-    bot_names = {
-        "grok", "xbot", "autobot", "tweetbot", "chatgpt",
-        "eliza_bot", "botly", "autopilot",
-    }
-    if uname in bot_names:
-        return True
 
-    # Bot patterns in username
-    bot_patterns = ["_bot", "bot_", "airdrop", "nft_", "_nft", "crypto_signal"]
-    if any(p in uname for p in bot_patterns):
+def _is_spam(username, text_lower):
+    """is_spam_or_bot() on already-lowercased text."""
+    return _username_is_bot(username) or _text_is_spam(text_lower)
+
+
+@functools.lru_cache(maxsize=4096)
+def _username_is_bot(username):
+    """Username-only half of the spam check — the same followers and authors come back
+    every cycle, so the answer is memoized per username."""
+    uname = username.lower()
+
+    if uname in _BOT_NAMES or _BOT_PATTERN_RE.search(uname):
         return True
 
     # ELON IMPERSONATOR DETECTION — these are the scam accounts spamming DMs
-    # Pattern: "Musk" or "Elon" in username + random numbers/letters
-    elon_patterns = [
-        "musk", "elon", "tesla_ceo", "spacex_ceo",
-        "doge_", "_doge", "dogefather",
-    ]
-    if any(p in uname for p in elon_patterns):
-        # Allow the REAL accounts
-        real_elon_accounts = {"elonmusk", "cb_doge", "dogedesigner"}
-        if uname not in real_elon_accounts:
-            return True
+    # Allow the REAL accounts
+    if _ELON_PATTERN_RE.search(uname) and uname not in _REAL_ELON_ACCOUNTS:
+        return True
 
     # Scam account patterns: random digits at end of username
-    import re
-    if re.search(r'\d{5,}$', uname):  # 5+ digits at end = likely bot
-        return True
-    if re.search(r'[A-Z]{2,}\d{3,}', username):  # Like "Musktechdi10938"
+    if _digit_tail_len(uname) >= 5:  # 5+ digits at end = likely bot
         return True
+    return _has_caps_then_digits(username)  # Like "MUSK10938"
 
-    text_lower = text.lower()
-
-    # Spam content signals
-    spam_signals = [
-        "free", "airdrop", "claim", "giveaway", "dm me", "send",
-        "won", "winner", "congratulations", "click here", "earn",
-        "money", "profit", "investment", "guaranteed", "100x",
-        "join now", "limited time", "act fast", "crypto signal",
-        "whitelist", "presale", "nft drop", "check dm",
-        "follow me", "follow back", "f4f", "promo",
-        "telegram", "whatsapp", "discord link",
-        # Elon scam signals
-        "elon is giving", "musk is sending", "free tesla",
-        "elon endorsed", "musk foundation",
-    ]
-    if any(s in text_lower for s in spam_signals):
-        return True
 
-    # Flattery/scam pattern: overly effusive praise to get engagement
-    flattery_signals = [
-        "you are amazing", "love your content", "great work sir",
-        "my friend i will", "nice to meet you", "hello friend",
-        "bless you", "god bless",
-    ]
-    if any(s in text_lower for s in flattery_signals):
-        return True
+def _text_is_spam(text_lower):
+    """Content half of the spam check — texts rarely repeat, so not cached."""
+    return _SPAM_TEXT_RE.search(text_lower) is not None
 
-    return False
+
+def classify_mentions(mentions):
+    """Screen a batch of (username, text) pairs for spam. Returns one bool per pair.
+    Each text is lowercased once; mentions are answered whatever their topic, so no topic scan."""
+    return [_is_spam(username, text.lower()) for username, text in mentions]
 
 
 # ============================================================
 # AUTO FOLLOW-BACK
 # ============================================================
-def follow_back_new_followers():
+def follow_back_new_followers(log=None):
     """Follow back anyone who follows us that we don't follow back."""
     if not AUTO_FOLLOW_BACK:
         return 0
 
     client = get_client()
-    log = load_engagement_log()
+    owns_log = log is None  # Standalone call — load and save here; in a cycle the caller does
+    if owns_log:
+        log = load_engagement_log()
     followed_count = 0
 
-    if not check_api_budget():
-        return 0
-
     try:
-        me = client.get_me()
-        track_api_call()
-        my_id = me.data.id
+        my_id, _ = get_identity()
 
+        if not reserve_api_call():
+            return 0
         followers = client.get_users_followers(
             id=my_id, max_results=100,
             user_fields=["id", "username"]
@@ -239,47 +525,80 @@ def follow_back_new_followers():
         if not followers.data:
             return 0
 
-        following = client.get_users_following(
-            id=my_id, max_results=1000,
-            user_fields=["id"]
-        )
-        following_ids = set()
-        if following.data:
-            following_ids = {str(u.id) for u in following.data}
+        if "_followed_back_set" not in log:
+            _index_replies(log)
+        already_followed = log["_followed_back_set"]
+        new_followers = [f for f in followers.data if str(f.id) not in already_followed]
+        if not new_followers:
+            return 0  # Everyone was handled before — no need to look at who we follow
 
-        already_followed = set(log.get("followed_back", []))
+        following_ids = _following_ids(client, my_id, log)
+        if following_ids is None:
+            print("  [Rate] API budget low, skipping follow-back")
+            return 0
 
-        for follower in followers.data:
+        for follower in new_followers:
             fid = str(follower.id)
-            if fid not in following_ids and fid not in already_followed:
+            if fid not in following_ids:
                 # Skip spam bots and Elon impersonators
-                if is_spam_or_bot(follower.username, ""):
+                if is_spam_or_bot(follower.username, ""):  # Username half is memoized
                     print(f"  Skipping bot/scam follow-back: @{follower.username}")
-                    log["followed_back"].append(fid)  # Mark as processed so we skip next time
+                    record_follow(log, fid)  # Mark as processed so we skip next time
                     continue
+                if not reserve_api_call():
+                    print("  [Rate] API budget low, pausing follow-back")
+                    break
                 try:
+                    follow_bucket.acquire()
                     client.follow_user(target_user_id=follower.id)
-                    log["followed_back"].append(fid)
+                    record_follow(log, fid)
                     followed_count += 1
                     print(f"  Followed back: @{follower.username}")
-                    time.sleep(random.uniform(2, 5))
                 except Exception as e:
                     print(f"  Error following @{follower.username}: {e}")
 
                 if followed_count >= 15:
                     break
 
-        save_engagement_log(log)
+        if owns_log:
+            save_engagement_log(log)
     except Exception as e:
         print(f"  Follow-back error: {e}")
 
     return followed_count
 
 
+def _following_ids(client, my_id, log):
+    """Set of account IDs we follow. Fetched from the API at most every FOLLOWING_REFRESH_HOURS;
+    in between — or while the API budget is spent — it comes from the snapshot saved in the
+    engagement log. None when there's no snapshot and no budget to fetch one."""
+    snapshot = log.get("following")
+    stale = (datetime.now(timezone.utc) - timedelta(hours=FOLLOWING_REFRESH_HOURS)).isoformat()
+    if not snapshot or snapshot.get("refreshed_at", "") < stale:
+        if reserve_api_call():
+            following = client.get_users_following(
+                id=my_id, max_results=1000,
+                user_fields=["id"]
+            )
+            snapshot = {
+                "ids": [str(u.id) for u in following.data or ()],
+                "refreshed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with _log_lock:
+                log["following"] = snapshot
+                log.pop("_following_ids_set", None)
+        elif not snapshot:
+            return None
+    with _log_lock:
+        if "_following_ids_set" not in log:
+            log["_following_ids_set"] = set(snapshot["ids"])
+        return log["_following_ids_set"]
+
+
 # ============================================================
 # AUTO-REPLY TO MENTIONS & REPLIES ON OWN TWEETS
 # ============================================================
-def reply_to_mentions():
+def reply_to_mentions(log=None):
     """Reply to recent mentions — but ONLY on-topic ones.
     Skip random off-topic mentions to avoid looking like a clueless bot.
     """
@@ -287,21 +606,16 @@ def reply_to_mentions():
         return 0
 
     client = get_client()
-    log = load_engagement_log()
+    owns_log = log is None  # Standalone call — load and save here; in a cycle the caller does
+    if owns_log:
+        log = load_engagement_log()
     reply_count = 0
 
     if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
         return 0
 
-    if not check_api_budget():
-        print("  [Rate] API budget low, skipping mention check")
-        return 0
-
     try:
-        me = client.get_me()
-        track_api_call()
-        my_id = me.data.id
-        my_username = me.data.username
+        my_id, my_username = get_identity()
 
         kwargs = {
             "id": my_id,
@@ -315,8 +629,11 @@ def reply_to_mentions():
         if since_id:
             kwargs["since_id"] = since_id
 
+        if not reserve_api_call():
+            print("  [Rate] API budget low, skipping mention check")
+            return 0
+        mentions_bucket.acquire()
         mentions = client.get_users_mentions(**kwargs)
-        track_api_call()
 
         if not mentions.data:
             return 0
@@ -327,15 +644,19 @@ def reply_to_mentions():
             for u in mentions.includes["users"]:
                 users[str(u.id)] = u.username
 
-        newest_id = None
-        all_replied = get_all_replied_tweet_ids(log)
+        # Mentions come newest first; the API also reports the newest ID directly
+        newest_id = (mentions.meta or {}).get("newest_id") or str(mentions.data[0].id)
+        all_replied = get_all_replied_tweet_ids(log)  # Live set — O(1) membership
 
-        for mention in mentions.data:
-            tweet_id = str(mention.id)
-
-            if newest_id is None:
-                newest_id = tweet_id
+        # Strip our @mention to get the actual content, then screen the whole batch at once
+        cleaned_texts = [mention.text.replace(f"@{my_username}", "").strip() for mention in mentions.data]
+        screened = classify_mentions(
+            (users.get(str(mention.author_id), "someone"), cleaned)
+            for mention, cleaned in zip(mentions.data, cleaned_texts)
+        )
 
+        for mention, cleaned, spam in zip(mentions.data, cleaned_texts, screened):
+            tweet_id = str(mention.id)
             if tweet_id in all_replied:
                 continue
 
@@ -346,16 +667,13 @@ def reply_to_mentions():
             author_username = users.get(author_id, "someone")
             tweet_text = mention.text
 
-            # Strip our @mention to get the actual content
-            cleaned = tweet_text.replace(f"@{my_username}", "").strip()
-
             # Skip very short content (just a tag, no substance)
             if len(cleaned) < 15:
                 print(f"  Skipping short mention from @{author_username}: '{cleaned[:30]}'")
                 continue
 
             # Skip spam and bots
-            if is_spam_or_bot(author_username, cleaned):
+            if spam:
                 print(f"  Skipping spam/bot @{author_username}: {cleaned[:40]}...")
                 continue
 
@@ -372,27 +690,33 @@ def reply_to_mentions():
                 reply_text = generate_reply(tweet_text, author_username, context="mention")
                 if not reply_text:
                     continue
-                client.create_tweet(text=reply_text, in_reply_to_tweet_id=mention.id)
-                track_api_call()
-
-                log["replies_sent"].append({
-                    "tweet_id": tweet_id,
-                    "author": author_username,
-                    "our_reply": reply_text,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
+                # The checks above only skip the LLM call — the reply and the API call are claimed here
+                if not reserve_reply(log, tweet_id):
+                    continue
+                try:
+                    if not reserve_api_call():
+                        print("  [Rate] API budget low, pausing replies")
+                        break
+                    create_tweet_bucket.acquire()
+                    client.create_tweet(text=reply_text, in_reply_to_tweet_id=mention.id)
+                    record_reply(log, "replies_sent", {
+                        "tweet_id": tweet_id,
+                        "author": author_username,
+                        "our_reply": reply_text,
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    })
+                finally:
+                    release_reply(log, tweet_id)
                 reply_count += 1
                 print(f"  Replied to @{author_username}: {reply_text[:60]}...")
 
-                time.sleep(random.uniform(3, 8))
-
             except Exception as e:
                 print(f"  Error replying to @{author_username}: {e}")
 
-        if newest_id:
-            log["last_mention_id"] = newest_id
+        log["last_mention_id"] = newest_id
 
-        save_engagement_log(log)
+        if owns_log:
+            save_engagement_log(log)
 
     except Exception as e:
         print(f"  Mention reply error: {e}")
@@ -403,7 +727,31 @@ def reply_to_mentions():
 # ============================================================
 # PROACTIVE ENGAGEMENT — Reply to big accounts' tweets
 # ============================================================
-def proactive_engage():
+def _recent_tweets(client, username, stop=None):
+    """A niche account's latest original tweets (two API calls), or None.
+    Once stop (a threading.Event) is set, a prefetch no longer spends budget."""
+    if (stop and stop.is_set()) or not reserve_api_call():
+        return None
+    user = client.get_user(username=username, user_fields=["id"])
+    if not user.data or (stop and stop.is_set()) or not reserve_api_call():
+        return None
+
+    tweets = client.get_users_tweets(
+        id=user.data.id,
+        max_results=10,
+        tweet_fields=["created_at", "public_metrics", "text"],
+        exclude=["retweets", "replies"],
+    )
+    return tweets.data
+
+
+def _proactive_room(log, extra=0):
+    """True while both hourly caps leave room for extra replies beyond the next one."""
+    return (get_replies_this_hour(log) + extra < MAX_REPLIES_PER_HOUR
+            and get_proactive_replies_this_hour(log) + extra < MAX_PROACTIVE_REPLIES_PER_HOUR)
+
+
+def proactive_engage(log=None):
     """Reply to recent tweets from accounts in our niche.
     Getting a reply from a big account = massive visibility boost.
     """
@@ -411,61 +759,60 @@ def proactive_engage():
         return 0
 
     client = get_client()
-    log = load_engagement_log()
+    owns_log = log is None  # Standalone call — load and save here; in a cycle the caller does
+    if owns_log:
+        log = load_engagement_log()
     reply_count = 0
 
     if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
         return 0
 
-    proactive_this_hour = sum(
-        1 for r in log.get("proactive_replies", [])
-        if r.get("timestamp", "") > (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
-    )
-    if proactive_this_hour >= MAX_PROACTIVE_REPLIES_PER_HOUR:
+    if get_proactive_replies_this_hour(log) >= MAX_PROACTIVE_REPLIES_PER_HOUR:
         return 0
 
-    # Pick multiple random accounts to engage with (3 per cycle for speed)
-    targets = random.sample(ENGAGE_WITH_ACCOUNTS, min(3, len(ENGAGE_WITH_ACCOUNTS)))
+    # Pick multiple random accounts to engage with (3 per cycle for speed),
+    # skipping anyone we already replied to recently
+    targets = [
+        target for target in random.sample(ENGAGE_WITH_ACCOUNTS, min(3, len(ENGAGE_WITH_ACCOUNTS)))
+        if not recently_replied_to_author(log, target)
+    ]
     already_replied = get_all_replied_tweet_ids(log)
 
-    for target in targets:
-        if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
-            break
-        if not check_api_budget():
-            print("  [Rate] API budget low, pausing proactive")
-            break
-
-        # Skip if we already replied to this person recently
-        if recently_replied_to_author(log, target):
-            continue
-
-        try:
-            user = client.get_user(username=target, user_fields=["id"])
-            track_api_call()
-            if not user.data:
-                continue
-
-            tweets = client.get_users_tweets(
-                id=user.data.id,
-                max_results=10,
-                tweet_fields=["created_at", "public_metrics", "text"],
-                exclude=["retweets", "replies"],
-            )
-            track_api_call()
+    # The next account's tweets are fetched in the background while this one's reply is generated
+    stop = threading.Event()  # Set when the loop ends, so a prefetch nobody will read stops spending budget
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = None
+        for i, target in enumerate(targets):
+            if not _proactive_room(log):
+                break
+            if pending is None:
+                if not check_api_budget():
+                    print("  [Rate] API budget low, pausing proactive")
+                    break
+                pending = prefetch.submit(_recent_tweets, client, target, stop)
 
-            if not tweets.data:
+            try:
+                tweets = pending.result()
+            except Exception as e:
+                print(f"  Proactive engage error for @{target}: {e}")
+                tweets = None
+            pending = None
+            # Prefetch only while the caps leave room for the next account's reply on top of this one's
+            if i + 1 < len(targets) and _proactive_room(log, extra=1) and check_api_budget():
+                pending = prefetch.submit(_recent_tweets, client, targets[i + 1], stop)
+
+            if not tweets:
                 continue
 
-            for tweet in tweets.data:
+            oldest = datetime.now(timezone.utc) - timedelta(hours=12)
+            for tweet in tweets:
                 tid = str(tweet.id)
                 if tid in already_replied:
                     continue
 
                 # Skip old tweets (>12h — fresher = more visible)
-                if tweet.created_at:
-                    age = datetime.now(timezone.utc) - tweet.created_at
-                    if age > timedelta(hours=12):
-                        continue
+                if tweet.created_at and tweet.created_at < oldest:
+                    continue
 
                 # Reply to tweets with any engagement (even 2 likes — early replies get seen more)
                 metrics = tweet.public_metrics or {}
@@ -482,71 +829,110 @@ def proactive_engage():
                         print(f"  Reply too short for @{target}, skipping")
                         continue
 
-                    client.create_tweet(text=reply_text, in_reply_to_tweet_id=tweet.id)
-                    track_api_call()
-
-                    log["proactive_replies"].append({
-                        "tweet_id": tid,
-                        "target": target,
-                        "tweet_text": tweet.text[:100],
-                        "our_reply": reply_text,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                    })
+                    if not reserve_reply(log, tid, target):
+                        break
+                    try:
+                        if not reserve_api_call():
+                            print("  [Rate] API budget low, pausing proactive")
+                            break
+                        create_tweet_bucket.acquire()
+                        client.create_tweet(text=reply_text, in_reply_to_tweet_id=tweet.id)
+                        record_reply(log, "proactive_replies", {
+                            "tweet_id": tid,
+                            "target": target,
+                            "tweet_text": tweet.text[:100],
+                            "our_reply": reply_text,
+                            "timestamp": datetime.now(timezone.utc).isoformat(),
+                        })
+                    finally:
+                        release_reply(log, tid)
                     reply_count += 1
-                    already_replied.add(tid)
                     print(f"  Proactive reply to @{target}: {reply_text[:60]}...")
-
-                    time.sleep(random.uniform(3, 8))
                     break  # One reply per account, then move to next target
 
                 except Exception as e:
                     print(f"  Error proactive reply to @{target}: {e}")
                     break
 
-        except Exception as e:
-            print(f"  Proactive engage error for @{target}: {e}")
+        stop.set()
+        if pending is not None:
+            pending.cancel()  # Not started yet — never runs; started — returns before its next call
 
-    save_engagement_log(log)
+    if owns_log:
+        save_engagement_log(log)
     return reply_count
 
 
 # ============================================================
-# TOPIC ENGAGEMENT — Search hot tweets on trending topics
+# SEARCH ENGAGEMENT — shared by topic and viral engagement
 # ============================================================
-def topic_engage():
-    """Search for trending topic tweets and reply to high-engagement ones.
-    This targets verified accounts discussing hot topics for max visibility.
-    """
-    if not PROACTIVE_REPLY:
-        return 0
+SEARCH_FILTERS = "-is:retweet -is:reply lang:en"
+MAX_QUERY_LENGTH = 512  # X API v2 recent-search query limit
+
+
+def _search_queries(terms):
+    """(term, full search query) pairs — built and length-checked once at import, not per call."""
+    queries = tuple((term, f"{term} {SEARCH_FILTERS}") for term in terms)
+    for term, query in queries:
+        if len(query) > MAX_QUERY_LENGTH:
+            raise ValueError(f"Search query for {term!r} is {len(query)} chars, over the {MAX_QUERY_LENGTH} limit")
+    return queries
+
+
+def _candidate_tweets(tweets, users, already_replied, max_age_hours, min_likes, min_followers,
+                      viral_exempt_likes=None):
+    """Yield (tweet, author_username, author_followers, likes) for search results worth replying to.
+    Authors under min_followers are skipped unless the tweet has viral_exempt_likes+ likes."""
+    oldest = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)  # One cutoff per batch
+    for tweet in tweets.data:
+        tid = str(tweet.id)
+        if tid in already_replied:
+            continue
 
-    client = get_client()
-    log = load_engagement_log()
-    reply_count = 0
+        # Skip old tweets — fresher = better visibility
+        if tweet.created_at and tweet.created_at < oldest:
+            continue
 
-    if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
-        return 0
-    if not check_api_budget():
-        print("  [Rate] API budget low, skipping topic engage")
-        return 0
+        metrics = tweet.public_metrics or {}
+        likes = metrics.get("like_count", 0)
+        # Target tweets with decent engagement (likely to be seen)
+        if likes < min_likes:
+            continue
 
-    already_replied = get_all_replied_tweet_ids(log)
+        author_info = users.get(str(tweet.author_id), {})
+        author_username = author_info.get("username", "someone")
+        author_followers = author_info.get("followers", 0)
 
-    # Pick a random topic to search
-    topic = random.choice(ENGAGE_TOPICS)
+        # Only reply to accounts with real audiences — their followers see our reply
+        if author_followers < min_followers and (viral_exempt_likes is None or likes < viral_exempt_likes):
+            continue
+
+        # Skip bots
+        if is_spam_or_bot(author_username, tweet.text):
+            continue
+
+        yield tweet, author_username, author_followers, likes
+
+
+def _engage_search(client, log, term, query, *, tag, topic_label, min_followers, viral_exempt_likes=None,
+                   min_likes=5, max_age_hours=6, min_reply_len=20, reply_cap=4):
+    """Run the search query for term and reply to the best candidates. Returns replies sent."""
+    reply_count = 0
+    already_replied = get_all_replied_tweet_ids(log)
 
     try:
-        # Search recent tweets on this topic — look for ones with engagement
+        if not reserve_api_call():
+            print(f"  [{tag}] API budget low, skipping search")
+            return 0
+        search_bucket.acquire()
         tweets = client.search_recent_tweets(
-            query=f"{topic} -is:retweet -is:reply lang:en",
+            query=query,
             max_results=20,
             tweet_fields=["author_id", "created_at", "public_metrics", "text"],
             expansions=["author_id"],
             user_fields=["username", "verified", "public_metrics"],
         )
 
-        track_api_call()
-
         if not tweets.data:
             return 0
 
@@ -560,75 +946,98 @@ def topic_engage():
                     "followers": u.public_metrics.get("followers_count", 0) if u.public_metrics else 0,
                 }
 
-        for tweet in tweets.data:
-            tid = str(tweet.id)
-            if tid in already_replied:
-                continue
-
-            # Skip old tweets
-            if tweet.created_at:
-                age = datetime.now(timezone.utc) - tweet.created_at
-                if age > timedelta(hours=6):  # Fresher = better visibility
-                    continue
-
-            metrics = tweet.public_metrics or {}
-            # Target tweets with decent engagement (likely to be seen)
-            if metrics.get("like_count", 0) < 5:
-                continue
-
-            author_id = str(tweet.author_id)
-            author_info = users.get(author_id, {})
-            author_username = author_info.get("username", "someone")
-
-            # Skip bots
-            if is_spam_or_bot(author_username, tweet.text):
-                continue
-
+        candidates = _candidate_tweets(
+            tweets, users, already_replied, max_age_hours, min_likes, min_followers, viral_exempt_likes,
+        )
+        for tweet, author_username, author_followers, likes in candidates:
             # Skip if we already replied to this person recently
             if recently_replied_to_author(log, author_username):
                 continue
 
-            # Only reply to accounts with real audiences (1000+ followers)
-            # Their followers see our reply — we want quality eyeballs
-            author_followers = author_info.get("followers", 0)
-            if author_followers < 1000 and metrics.get("like_count", 0) < 50:
-                continue  # Skip unless tweet is mega-viral
-
-            if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
+            if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR or not check_api_budget():
                 break
 
             try:
                 reply_text = generate_reply(tweet.text, author_username, context="proactive")
-                if not reply_text or len(reply_text) < 30:
+                if not reply_text or len(reply_text) < min_reply_len:
                     continue
 
-                client.create_tweet(text=reply_text, in_reply_to_tweet_id=tweet.id)
-                track_api_call()
-
-                log["proactive_replies"].append({
-                    "tweet_id": tid,
-                    "target": author_username,
-                    "topic": topic,
-                    "tweet_text": tweet.text[:100],
-                    "our_reply": reply_text,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
+                if not reserve_reply(log, str(tweet.id), author_username):
+                    continue
+                try:
+                    if not reserve_api_call():
+                        break
+                    create_tweet_bucket.acquire()
+                    client.create_tweet(text=reply_text, in_reply_to_tweet_id=tweet.id)
+                    record_reply(log, "proactive_replies", {
+                        "tweet_id": str(tweet.id),
+                        "target": author_username,
+                        "topic": topic_label,
+                        "tweet_text": tweet.text[:100],
+                        "our_reply": reply_text,
+                        "followers": author_followers,
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    })
+                finally:
+                    release_reply(log, str(tweet.id))
                 reply_count += 1
-                print(f"  [Topic] Replied to @{author_username} on '{topic}': {reply_text[:60]}...")
-
-                time.sleep(random.uniform(3, 8))
+                print(f"  [{tag}] Replied to @{author_username} ({author_followers} followers, {likes} likes) on '{term}': {reply_text[:60]}...")
 
-                if reply_count >= 6:  # Max 6 per topic search cycle
+                if reply_count >= reply_cap:
                     break
 
             except Exception as e:
-                print(f"  [Topic] Error replying to @{author_username}: {e}")
+                err = str(e)
+                if "429" in err or "rate" in err.lower():
+                    print(f"  [{tag}] Rate limited, stopping")
+                    break
+                print(f"  [{tag}] Error replying to @{author_username}: {e}")
                 break
 
     except Exception as e:
-        print(f"  [Topic] Search error for '{topic}': {e}")
+        err = str(e)
+        if "429" in err or "rate" in err.lower():
+            print(f"  [{tag}] Search rate limited")
+        else:
+            print(f"  [{tag}] Search error for '{term}': {e}")
 
-    save_engagement_log(log)
+    return reply_count
+
+
+# ============================================================
+# TOPIC ENGAGEMENT — Search hot tweets on trending topics
+# ============================================================
+TOPIC_QUERIES = _search_queries(ENGAGE_TOPICS)
+
+
+def topic_engage(log=None):
+    """Search for trending topic tweets and reply to high-engagement ones.
+    This targets verified accounts discussing hot topics for max visibility.
+    """
+    if not PROACTIVE_REPLY:
+        return 0
+
+    client = get_client()
+    owns_log = log is None  # Standalone call — load and save here; in a cycle the caller does
+    if owns_log:
+        log = load_engagement_log()
+
+    if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
+        return 0
+    if not check_api_budget():
+        print("  [Rate] API budget low, skipping topic engage")
+        return 0
+
+    # Pick a random topic to search
+    topic, query = random.choice(TOPIC_QUERIES)
+    # 1000+ follower authors, unless the tweet is mega-viral (50+ likes)
+    reply_count = _engage_search(
+        client, log, topic, query, tag="Topic", topic_label=topic,
+        min_followers=1000, viral_exempt_likes=50, min_reply_len=30, reply_cap=6,
+    )
+
+    if owns_log:
+        save_engagement_log(log)
     return reply_count
 
 
@@ -653,12 +1062,13 @@ VIRAL_SEARCHES = [
     "change my mind technology", "consciousness AI",
     "simulation theory", "decentralized future",
 ]
+VIRAL_QUERIES = _search_queries(VIRAL_SEARCHES)
 
 # Minimum followers for viral engage targets — filters out random nobodies
 MIN_FOLLOWERS_VIRAL = 1000
 
 
-def viral_engage():
+def viral_engage(log=None):
     """Reply to viral tweets from quality accounts with real audiences.
     Targets tech/AI/science content from accounts with 1000+ followers.
     """
@@ -666,8 +1076,9 @@ def viral_engage():
         return 0
 
     client = get_client()
-    log = load_engagement_log()
-    reply_count = 0
+    owns_log = log is None  # Standalone call — load and save here; in a cycle the caller does
+    if owns_log:
+        log = load_engagement_log()
 
     if get_replies_this_hour(log) >= MAX_REPLIES_PER_HOUR:
         return 0
@@ -675,189 +1086,84 @@ def viral_engage():
         print("  [Rate] API budget low, skipping viral engage")
         return 0
 
-    already_replied = get_all_replied_tweet_ids(log)
-
     # Pick a random tech/AI viral search
-    query = random.choice(VIRAL_SEARCHES)
-
-    try:
-        tweets = client.search_recent_tweets(
-            query=f'{query} -is:retweet -is:reply lang:en',
-            max_results=20,
-            tweet_fields=["author_id", "created_at", "public_metrics", "text"],
-            expansions=["author_id"],
-            user_fields=["username", "verified", "public_metrics"],
-        )
-        track_api_call()
-
-        if not tweets.data:
-            return 0
-
-        # Build user lookup
-        users = {}
-        if tweets.includes and "users" in tweets.includes:
-            for u in tweets.includes["users"]:
-                users[str(u.id)] = {
-                    "username": u.username,
-                    "verified": getattr(u, "verified", False),
-                    "followers": u.public_metrics.get("followers_count", 0) if u.public_metrics else 0,
-                }
-
-        for tweet in tweets.data:
-            tid = str(tweet.id)
-            if tid in already_replied:
-                continue
-
-            if tweet.created_at:
-                age = datetime.now(timezone.utc) - tweet.created_at
-                if age > timedelta(hours=6):
-                    continue
-
-            metrics = tweet.public_metrics or {}
-            likes = metrics.get("like_count", 0)
-
-            # Must have some engagement
-            if likes < 5:
-                continue
-
-            author_id = str(tweet.author_id)
-            author_info = users.get(author_id, {})
-            author_username = author_info.get("username", "someone")
-            author_followers = author_info.get("followers", 0)
-
-            # QUALITY FILTER: Only engage with accounts that have real audiences
-            # Their followers will see our reply — we want THOSE followers
-            if author_followers < MIN_FOLLOWERS_VIRAL:
-                continue
-
-            if is_spam_or_bot(author_username, tweet.text):
-                continue
-
-            # Skip if we already replied to this person recently
-            if recently_replied_to_author(log, author_username):
-                continue
-
-            if not check_api_budget():
-                break
-
-            try:
-                reply_text = generate_reply(tweet.text, author_username, context="proactive")
-                if not reply_text or len(reply_text) < 20:
-                    continue
-
-                client.create_tweet(text=reply_text, in_reply_to_tweet_id=tweet.id)
-                track_api_call()
-
-                log["proactive_replies"].append({
-                    "tweet_id": tid,
-                    "target": author_username,
-                    "topic": f"viral:{query}",
-                    "tweet_text": tweet.text[:100],
-                    "our_reply": reply_text,
-                    "followers": author_followers,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-                reply_count += 1
-                already_replied.add(tid)
-                print(f"  [Viral] Replied to @{author_username} ({author_followers} followers, {likes} likes): {reply_text[:60]}...")
-
-                time.sleep(random.uniform(3, 8))
-
-                if reply_count >= 4:
-                    break
-
-            except Exception as e:
-                err = str(e)
-                if "429" in err or "rate" in err.lower():
-                    print(f"  [Viral] Rate limited, stopping")
-                    break
-                print(f"  [Viral] Error replying to @{author_username}: {e}")
-                break
-
-    except Exception as e:
-        err = str(e)
-        if "429" in err or "rate" in err.lower():
-            print(f"  [Viral] Search rate limited")
-        else:
-            print(f"  [Viral] Search error for '{query}': {e}")
+    search, query = random.choice(VIRAL_QUERIES)
+    reply_count = _engage_search(
+        client, log, search, query, tag="Viral", topic_label=f"viral:{search}",
+        min_followers=MIN_FOLLOWERS_VIRAL, min_reply_len=20, reply_cap=4,
+    )
 
-    save_engagement_log(log)
+    if owns_log:
+        save_engagement_log(log)
     return reply_count
 
 
 # ============================================================
 # CLEANUP — Trim old log entries
 # ============================================================
-def cleanup_log():
+def cleanup_log(log=None):
     """Remove log entries older than 7 days to keep file small."""
-    log = load_engagement_log()
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-
-    for key in ["replies_sent", "proactive_replies"]:
-        if key in log:
-            log[key] = [
-                entry for entry in log[key]
-                if entry.get("timestamp", "") > cutoff
-            ]
-
-    if len(log.get("followed_back", [])) > 1000:
-        log["followed_back"] = log["followed_back"][-1000:]
-
-    save_engagement_log(log)
+    owns_log = log is None
+    if owns_log:
+        log = load_engagement_log()
+    with _log_lock:
+        _trim_replies(log, (datetime.now(timezone.utc) - timedelta(days=7)).isoformat())
+        del log["followed_back"][:-1000]  # Keep the newest 1000 — no-op when already under
+        _index_replies(log)  # Trimmed lists — rebuild the lookups
+
+    if owns_log:
+        save_engagement_log(log)
 
 
 # ============================================================
 # MAIN ENGAGEMENT LOOP
 # ============================================================
 def run_engagement_cycle():
-    """Run one full engagement cycle. Called by the scheduler."""
+    """Run one full engagement cycle. Called by the scheduler.
+    The log is loaded once, shared by every phase, and saved once — even if a phase blows up."""
     results = {"followed": 0, "replied": 0, "proactive": 0, "topic": 0}
-
-    # 1. Follow back new followers
+    log = load_engagement_log()
     try:
-        results["followed"] = follow_back_new_followers()
-        if results["followed"]:
-            print(f"  [Engagement] Followed back {results['followed']} users")
-    except Exception as e:
-        print(f"  [Engagement] Follow-back error: {e}")
+        _run_phases(log, results)
+    finally:
+        save_engagement_log(log)
+    return results
 
-    # 2. Reply to mentions (THE #1 algorithm signal)
-    try:
-        results["replied"] = reply_to_mentions()
-        if results["replied"]:
-            print(f"  [Engagement] Replied to {results['replied']} mentions")
-    except Exception as e:
-        print(f"  [Engagement] Reply error: {e}")
 
-    # 3. Proactive engagement — reply to big accounts
-    try:
-        results["proactive"] = proactive_engage()
-        if results["proactive"]:
-            print(f"  [Engagement] Sent {results['proactive']} proactive replies")
-    except Exception as e:
-        print(f"  [Engagement] Proactive error: {e}")
+# (results key, phase, what to print when it did something, label for errors) — run concurrently
+ENGAGEMENT_PHASES = (
+    ("followed", follow_back_new_followers, "Followed back {} users", "Follow-back"),
+    ("replied", reply_to_mentions, "Replied to {} mentions", "Reply"),  # THE #1 algorithm signal
+    ("proactive", proactive_engage, "Sent {} proactive replies", "Proactive"),
+    ("topic", topic_engage, "Replied to {} trending topic tweets", "Topic engage"),
+    ("viral", viral_engage, "Replied to {} viral tweets", "Viral engage"),
+)
 
-    # 4. Topic engagement — search trending topics
-    try:
-        results["topic"] = topic_engage()
-        if results["topic"]:
-            print(f"  [Engagement] Replied to {results['topic']} trending topic tweets")
-    except Exception as e:
-        print(f"  [Engagement] Topic engage error: {e}")
 
-    # 5. Viral engagement — reply to random viral tweets from strangers
-    try:
-        results["viral"] = viral_engage()
-        if results["viral"]:
-            print(f"  [Engagement] Replied to {results['viral']} viral tweets")
-    except Exception as e:
-        print(f"  [Engagement] Viral engage error: {e}")
+async def run_phases_async(log, results):
+    """The engagement phases of one cycle on one event loop, all working on the same log.
+    They spend nearly all their time waiting on the X API and pacing, so they run side by side —
+    tweepy is blocking, so each phase gets a worker thread; budget and log updates are lock-protected."""
+    outcomes = await asyncio.gather(
+        *(asyncio.to_thread(phase, log) for _, phase, _, _ in ENGAGEMENT_PHASES),
+        return_exceptions=True,
+    )
+    for (key, _, done, label), outcome in zip(ENGAGEMENT_PHASES, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"  [Engagement] {label} error: {outcome}")
+            continue
+        results[key] = outcome
+        if outcome:
+            print(f"  [Engagement] {done.format(outcome)}")
 
-    # 6. Periodic cleanup
-    if random.random() < 0.05:
-        cleanup_log()
 
-    return results
+def _run_phases(log, results):
+    """Run every phase to completion, then the occasional cleanup."""
+    asyncio.run(run_phases_async(log, results))
+
+    # Periodic cleanup, once every phase is finished with the log
+    if random.random() < 0.05:
+        cleanup_log(log)
 
 
 if __name__ == "__main__":
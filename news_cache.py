@@ -0,0 +1,31 @@
+"""
+One shared, time-limited copy of the RSS headlines.
+Queue refills, on-the-fly generation and news sharing all read from here, so they
+share a single fetch per NEWS_TTL instead of each hitting every feed again.
+"""
+import asyncio
+import threading
+import time
+
+from content_generator import fetch_news_headlines
+
+NEWS_TTL = 900  # Seconds a fetched batch of headlines is reused
+
+_lock = threading.Lock()  # Held across the fetch — concurrent callers wait for it rather than refetch
+_fetched_at = None
+_headlines = []
+
+
+def headlines():
+    """Current headlines, refetched once NEWS_TTL has passed. Safe to call from any thread."""
+    global _fetched_at, _headlines
+    with _lock:
+        if _fetched_at is None or time.monotonic() - _fetched_at > NEWS_TTL:
+            _headlines = fetch_news_headlines()
+            _fetched_at = time.monotonic()
+        return _headlines
+
+
+async def get_headlines():
+    """headlines() for the daemon's event loop — a refetch runs in a worker thread."""
+    return await asyncio.to_thread(headlines)
@@ -2,37 +2,48 @@
 X API posting module.
 Handles authentication, posting tweets, threads, and reply management.
 """
-import json
+import functools
 import time
 from datetime import datetime, timezone
-from pathlib import Path
 
 import tweepy
+from requests.adapters import HTTPAdapter
 
 from config import (
-    X_API_KEY,
-    X_API_SECRET,
-    X_ACCESS_TOKEN,
-    X_ACCESS_TOKEN_SECRET,
-    X_BEARER_TOKEN,
+    CFG,
     POST_LOG_FILE,
+    POST_LOG_PATH,
+    LEGACY_POST_LOG_FILE,
     INCLUDE_LINKS_IN_REPLY,
 )
+from storage import append_record, append_records, bisect_records, count_records, migrate_json_array
 
 
+@functools.lru_cache(maxsize=1)
 def get_client():
-    """Create authenticated tweepy Client for X API v2."""
+    """Authenticated tweepy Client for X API v2 — built once and shared by posting and
+    engagement, so every call reuses the same keep-alive connections."""
     client = tweepy.Client(
-        bearer_token=X_BEARER_TOKEN,
-        consumer_key=X_API_KEY,
-        consumer_secret=X_API_SECRET,
-        access_token=X_ACCESS_TOKEN,
-        access_token_secret=X_ACCESS_TOKEN_SECRET,
-        wait_on_rate_limit=True,
+        bearer_token=CFG.X_BEARER_TOKEN,
+        consumer_key=CFG.X_API_KEY,
+        consumer_secret=CFG.X_API_SECRET,
+        access_token=CFG.X_ACCESS_TOKEN,
+        access_token_secret=CFG.X_ACCESS_TOKEN_SECRET,
+        wait_on_rate_limit=True,  # Let tweepy handle 429s gracefully
     )
+    # Room for a burst of calls (thread + link reply, engagement phases) without reconnecting
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    client.session.mount("https://", adapter)
     return client
 
 
+@functools.lru_cache(maxsize=1)
+def get_identity():
+    """(user_id, username) of the authenticated account — fetched once, it never changes mid-process."""
+    me = get_client().get_me()
+    return me.data.id, me.data.username
+
+
 def post_tweet(text, reply_to_id=None):
     """Post a single tweet. Returns the tweet ID."""
     client = get_client()
@@ -48,18 +59,36 @@ def post_tweet(text, reply_to_id=None):
     return tweet_id
 
 
+THREAD_TWEET_GAP = 2  # Seconds between thread tweets, counted from the previous call's start
+
+
 def post_thread(tweets):
-    """Post a thread of tweets. Returns list of tweet IDs."""
+    """Post a thread of tweets. Returns list of tweet IDs.
+    The thread is logged with one append at the end (also if a tweet fails partway)."""
+    client = get_client()
     tweet_ids = []
+    entries = []
     reply_to = None
+    started = None
 
-    for i, text in enumerate(tweets):
-        tweet_id = post_tweet(text, reply_to_id=reply_to)
-        tweet_ids.append(tweet_id)
-        reply_to = tweet_id
-
-        if i < len(tweets) - 1:
-            time.sleep(2)  # Small delay between thread tweets
+    try:
+        for text in tweets:
+            if started is not None:
+                # Small delay between thread tweets — the API round-trip already counts toward it
+                time.sleep(max(0.0, THREAD_TWEET_GAP - (time.monotonic() - started)))
+            started = time.monotonic()
+
+            kwargs = {"text": text}
+            if reply_to:
+                kwargs["in_reply_to_tweet_id"] = reply_to
+            tweet_id = client.create_tweet(**kwargs).data["id"]
+
+            tweet_ids.append(tweet_id)
+            entries.append(_post_entry(tweet_id, text, reply_to_id=reply_to))
+            reply_to = tweet_id
+    finally:
+        _migrate_post_log()
+        append_records(POST_LOG_PATH, entries)
 
     return tweet_ids
 
@@ -94,9 +123,7 @@ def quote_tweet(text, quote_tweet_id):
 
 def retweet(tweet_id):
     """Retweet a tweet. Returns True if successful."""
-    client = get_client()
-    me = client.get_me()
-    client.retweet(tweet_id=tweet_id, user_auth=True)
+    get_client().retweet(tweet_id=tweet_id)  # Authenticates as the OAuth1 user itself
     log_post(tweet_id, f"[RETWEET] {tweet_id}")
     return True
 
@@ -128,43 +155,41 @@ def post_content(content):
         return tweet_id
 
 
-def log_post(tweet_id, text, reply_to_id=None):
-    """Log posted tweets for tracking."""
-    log_file = Path(POST_LOG_FILE)
-    logs = []
-    if log_file.exists():
-        try:
-            logs = json.loads(log_file.read_text())
-        except json.JSONDecodeError:
-            logs = []
-
-    logs.append({
+@functools.lru_cache(maxsize=1)
+def _migrate_post_log():
+    """Convert the old JSON-array post log to NDJSON once per process."""
+    migrate_json_array(LEGACY_POST_LOG_FILE, POST_LOG_FILE)
+
+
+def _post_entry(tweet_id, text, reply_to_id=None):
+    return {
         "tweet_id": str(tweet_id),
         "text": text,
         "reply_to": str(reply_to_id) if reply_to_id else None,
         "posted_at": datetime.now(timezone.utc).isoformat(),
-    })
+    }
+
 
-    log_file.write_text(json.dumps(logs, indent=2))
+def log_post(tweet_id, text, reply_to_id=None):
+    """Log posted tweets for tracking. Appends one line — never rewrites history."""
+    _migrate_post_log()
+    append_record(POST_LOG_PATH, _post_entry(tweet_id, text, reply_to_id=reply_to_id))
 
 
 def get_post_count_today():
     """Get number of posts made today."""
-    log_file = Path(POST_LOG_FILE)
-    if not log_file.exists():
-        return 0
+    _migrate_post_log()
+    today = datetime.now(timezone.utc).date().isoformat()
+    # The log is appended in posted_at order — binary-search where today starts, then count lines
+    return count_records(POST_LOG_PATH, bisect_records(POST_LOG_PATH, _posted_at, today))
 
-    try:
-        logs = json.loads(log_file.read_text())
-    except json.JSONDecodeError:
-        return 0
 
-    today = datetime.now(timezone.utc).date().isoformat()
-    return sum(1 for log in logs if log["posted_at"].startswith(today))
+def _posted_at(entry):
+    return entry.get("posted_at", "")
 
 
 def check_credentials():
-    """Verify API credentials are working."""
+    """Verify API credentials are working. Always hits the API — get_identity() is the cached path."""
     try:
         client = get_client()
         me = client.get_me()
@@ -0,0 +1,167 @@
+"""
+The content queue on disk and in memory.
+Kept apart from scheduler.py so `run.py preview` can read the queue without importing
+the generator, poster and engagement modules.
+"""
+import asyncio
+import bisect
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+from config import CONTENT_QUEUE_FILE
+from storage import dumps, loads, write_atomic
+
+
+@dataclass(slots=True)
+class QueueItem:
+    """One queued post. The fields the queue itself reads are plain attributes; anything else
+    the generator returned (quote_tweet_id, source_link, ...) rides along in extra."""
+    type: str
+    category: str
+    text: str | None = None
+    tweets: list[str] | None = None
+    generated_at: str | None = None
+    posted: bool = False
+    posted_at: str | None = None
+    extra: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Loaded items would otherwise each carry their own copy of a handful of category names
+        self.category = sys.intern(self.category)
+
+    @classmethod
+    def from_record(cls, record):
+        """Build from a flat dict — a generate_tweet() result or a line of the queue file."""
+        known = {name: record[name] for name in _ITEM_FIELDS if name in record}
+        return cls(**known, extra={k: v for k, v in record.items() if k not in _ITEM_FIELDS})
+
+    def to_record(self):
+        """The flat dict the queue file stores and post_content() takes."""
+        record = {name: getattr(self, name) for name in _ITEM_FIELDS}
+        record.update(self.extra)
+        return record
+
+
+_ITEM_FIELDS = tuple(f.name for f in fields(QueueItem) if f.name != "extra")
+
+
+SAVE_DEBOUNCE = 1.5  # Seconds the daemon waits after a queue change so a burst of changes saves once
+# One writer at a time — a cancelled saver's to_thread save keeps running, and two saves would
+# share write_atomic's .tmp path
+_save_lock = threading.Lock()
+
+
+class QueueStore:
+    """The content queue in memory: unposted items in one FIFO deque per category, plus the
+    items posted today (kept so they're still saved until the daily cleanup drops them).
+    Picking the next item for a slot is a dict lookup and a popleft instead of a list scan."""
+
+    def __init__(self, items=(), categories=()):
+        self.by_cat = {category: deque() for category in categories}  # Known up front — no setdefault misses later
+        self.posted_log = []
+        self.unposted_count = 0  # Kept current by every add/remove, never recounted
+        self._lock = threading.Lock()  # Posting/refill threads mutate while the saver snapshots
+        self._loop = None
+        self._dirty = None  # asyncio.Event once the daemon's debounced saver is running
+        for item in items:
+            if item.posted:
+                self.posted_log.append(item)
+            else:
+                self.append(item)
+
+    def append(self, item):
+        """Queue an unposted item at the back of its category."""
+        with self._lock:
+            self.by_cat.setdefault(item.category, deque()).append(item)
+            self.unposted_count += 1
+
+    def requeue(self, item):
+        """Put a popped item back at the front of its category (e.g. its post failed)."""
+        with self._lock:
+            self.by_cat.setdefault(item.category, deque()).appendleft(item)
+            self.unposted_count += 1
+
+    def pop(self, category):
+        """Remove and return the oldest unposted item for category, or None."""
+        with self._lock:
+            items = self.by_cat.get(category)
+            if not items:
+                return None
+            self.unposted_count -= 1
+            return items.popleft()
+
+    def pop_oldest(self):
+        """Remove and return the oldest unposted item of any category, or None."""
+        with self._lock:
+            fronts = [items[0] for items in self.by_cat.values() if items]
+        if not fronts:
+            return None
+        return self.pop(min(fronts, key=lambda item: item.generated_at or "").category)
+
+    def count(self, category):
+        return len(self.by_cat.get(category, ()))
+
+    def unposted(self):
+        """All unposted items, category by category."""
+        with self._lock:
+            return [item for items in self.by_cat.values() for item in items]
+
+    def items(self):
+        """Everything to persist — today's posted items followed by the unposted ones."""
+        return self.posted_log + self.unposted()
+
+    def add_posted(self, item):
+        with self._lock:
+            self.posted_log.append(item)
+
+    def gc_posted(self, today):
+        """Forget items posted before today (an ISO date). They're appended in posting order,
+        so the cut point is a bisect and the drop is one in-place slice delete."""
+        with self._lock:
+            del self.posted_log[:bisect.bisect_left(self.posted_log, today, key=lambda item: item.posted_at or "")]
+
+    def changed(self):
+        """Persist a change — right away, or under the daemon by waking the debounced saver."""
+        if self._dirty is None:
+            save_queue(self)
+        else:
+            self._loop.call_soon_threadsafe(self._dirty.set)
+
+    async def flush(self):
+        """Write the queue now, whatever the saver has pending — the daemon's last save on shutdown."""
+        await asyncio.to_thread(save_queue, self)
+
+    async def saver(self):
+        """Daemon task: write the queue once per burst of changes instead of once per change."""
+        self._loop = asyncio.get_running_loop()
+        self._dirty = asyncio.Event()
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(SAVE_DEBOUNCE)  # Let the rest of the burst land
+            self._dirty.clear()
+            await asyncio.to_thread(save_queue, self)
+
+
+def load_queue(categories=()):
+    """Load the content queue from disk into a QueueStore (posted items are dropped).
+    categories get their (empty) deques up front."""
+    queue_file = Path(CONTENT_QUEUE_FILE)
+    if queue_file.exists():
+        try:
+            records = loads(queue_file.read_bytes())
+            return QueueStore((QueueItem.from_record(r) for r in records if not r.get("posted", False)),
+                              categories)
+        except ValueError:  # orjson and stdlib decode errors both subclass it
+            pass
+    return QueueStore(categories=categories)
+
+
+def save_queue(store):
+    """Save the content queue to disk as compact JSON (orjson when installed). write_atomic fsyncs a temp file and
+    renames it into place, so a crash or SIGKILL mid-save never leaves a truncated queue."""
+    with _save_lock:  # Snapshot inside the lock too, so the last writer always has the newest state
+        records = [item.to_record() for item in store.items()]
+        write_atomic(CONTENT_QUEUE_FILE, dumps(records))
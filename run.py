@@ -13,14 +13,10 @@ Usage:
     python run.py engage         # Run one engagement cycle
     python run.py stats          # Show posting stats
 """
-import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
-from dotenv import load_dotenv
-load_dotenv()
-
 
 def cmd_setup():
     """Verify setup and credentials."""
@@ -61,38 +57,31 @@ def cmd_generate():
     from config import CONTENT_QUEUE_SIZE
 
     print("Generating content queue...")
-    queue = load_queue()
-    queue = refill_queue(queue, target_size=CONTENT_QUEUE_SIZE)
-    unposted = [q for q in queue if not q.get("posted")]
-    print(f"\nQueue now has {len(unposted)} unposted items ready to go.")
+    store = refill_queue(load_queue(), target_size=CONTENT_QUEUE_SIZE)
+    print(f"\nQueue now has {store.unposted_count} unposted items ready to go.")
 
 
 def cmd_preview():
     """Preview the content queue."""
-    from scheduler import load_queue
-    from config import POSTING_SCHEDULE
+    from queue_io import load_queue
 
-    queue = load_queue()
-    unposted = [q for q in queue if not q.get("posted")]
+    store = load_queue()
 
-    if not unposted:
+    if not store.unposted_count:
         print("Queue is empty. Run: python run.py generate")
         return
 
-    print(f"Content Queue: {len(unposted)} items\n")
-
-    by_category = {}
-    for item in unposted:
-        cat = item.get("category", "unknown")
-        by_category.setdefault(cat, []).append(item)
+    print(f"Content Queue: {store.unposted_count} items\n")
 
-    for cat, items in sorted(by_category.items()):
+    for cat, items in sorted(store.by_cat.items()):
+        if not items:
+            continue
         print(f"\n--- {cat.upper()} ({len(items)} queued) ---")
-        for item in items[:3]:
-            if item.get("type") == "thread":
-                print(f"  [THREAD] {item['tweets'][0][:70]}...")
+        for item in list(items)[:3]:
+            if item.type == "thread":
+                print(f"  [THREAD] {item.tweets[0][:70]}...")
             else:
-                print(f"  {item['text'][:70]}...")
+                print(f"  {item.text[:70]}...")
         if len(items) > 3:
             print(f"  ... and {len(items) - 3} more")
 
@@ -121,45 +110,47 @@ def cmd_engage():
 
 def cmd_stats():
     """Show posting statistics."""
-    from config import POST_LOG_FILE, ENGAGEMENT_LOG_FILE
-    log_file = Path(POST_LOG_FILE)
-
-    if not log_file.exists():
+    from config import (POST_LOG_FILE, LEGACY_POST_LOG_FILE, ENGAGEMENT_LOG_FILE, LEGACY_ENGAGEMENT_LOG_FILE,
+                        ENGAGEMENT_COUNTS_FILE)
+    from storage import bisect_records, count_records, last_record, load_counts, loads, migrate_json_array
+
+    migrate_json_array(LEGACY_POST_LOG_FILE, POST_LOG_FILE)
+    # Streamed — only the last record is ever parsed, so this stays fast however long the log gets
+    last = last_record(POST_LOG_FILE)
+    if last is None:
         print("No posts yet.")
     else:
-        logs = json.loads(log_file.read_text())
-        total = len(logs)
+        total = count_records(POST_LOG_FILE)
+        # The log is in posted_at order — binary-search where today starts, count from there
         today = datetime.now(timezone.utc).date().isoformat()
-        today_count = sum(1 for l in logs if l["posted_at"].startswith(today))
+        today_count = count_records(POST_LOG_FILE, bisect_records(POST_LOG_FILE, _posted_at, today))
         print(f"Total posts: {total}")
         print(f"Posts today: {today_count}")
-        if logs:
-            last = logs[-1]
-            print(f"Last post: {last['posted_at']}")
-            print(f"Last text: {last['text'][:60]}...")
-
-    # Engagement stats
-    eng_file = Path(ENGAGEMENT_LOG_FILE)
-    if eng_file.exists():
+        print(f"Last post: {last['posted_at']}")
+        print(f"Last text: {last['text'][:60]}...")
+
+    # Engagement stats — read from the counts sidecar (or the raw event stream), so stats
+    # never has to import the engagement engine and its API clients
+    eng = None
+    if ENGAGEMENT_LOG_FILE.exists():
+        eng = load_counts(ENGAGEMENT_COUNTS_FILE, ENGAGEMENT_LOG_FILE,
+                          ("followed_back", "replies_sent", "proactive_replies"))
+    elif LEGACY_ENGAGEMENT_LOG_FILE.exists():  # Not migrated yet — still a single JSON object
         try:
-            eng = json.loads(eng_file.read_text())
-            print(f"\n--- Engagement Stats ---")
-            print(f"Followed back: {len(eng.get('followed_back', []))} users")
-            print(f"Replies sent: {len(eng.get('replies_sent', []))}")
-            print(f"Proactive replies: {len(eng.get('proactive_replies', []))}")
-        except json.JSONDecodeError:
-            pass
-
-
-COMMANDS = {
-    "setup": cmd_setup,
-    "generate": cmd_generate,
-    "preview": cmd_preview,
-    "post": cmd_post,
-    "start": cmd_start,
-    "engage": cmd_engage,
-    "stats": cmd_stats,
-}
+            eng = {kind: len(entries) for kind, entries in loads(LEGACY_ENGAGEMENT_LOG_FILE.read_bytes()).items()
+                   if isinstance(entries, list)}
+        except ValueError:
+            eng = {}
+    if eng is not None:
+        print(f"\n--- Engagement Stats ---")
+        print(f"Followed back: {eng.get('followed_back', 0)} users")
+        print(f"Replies sent: {eng.get('replies_sent', 0)}")
+        print(f"Proactive replies: {eng.get('proactive_replies', 0)}")
+
+
+def _posted_at(record):
+    return record.get("posted_at", "")
+
 
 CATEGORY_SHORTCUTS = {
     "elon": "elon_update",
@@ -187,15 +178,25 @@ if __name__ == "__main__":
         print(__doc__)
         sys.exit(0)
 
-    cmd = sys.argv[1].lower()
-
-    if cmd in COMMANDS:
-        if cmd == "post" and len(sys.argv) > 2:
-            cat_shortcut = sys.argv[2].lower()
-            category = CATEGORY_SHORTCUTS.get(cat_shortcut, cat_shortcut)
+    match sys.argv[1].lower():
+        case "setup":
+            cmd_setup()
+        case "generate":
+            cmd_generate()
+        case "preview":
+            cmd_preview()
+        case "post":
+            category = None
+            if len(sys.argv) > 2:
+                cat_shortcut = sys.argv[2].lower()
+                category = CATEGORY_SHORTCUTS.get(cat_shortcut, cat_shortcut)
             cmd_post(category)
-        else:
-            COMMANDS[cmd]()
-    else:
-        print(f"Unknown command: {cmd}")
-        print(__doc__)
+        case "start":
+            cmd_start()
+        case "engage":
+            cmd_engage()
+        case "stats":
+            cmd_stats()
+        case cmd:
+            print(f"Unknown command: {cmd}")
+            print(__doc__)
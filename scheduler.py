@@ -2,18 +2,22 @@
 Main scheduler — runs continuously, posting at scheduled times + engagement engine.
 Posts aggressively (30+ tweets/day) and engages between posts.
 """
-import json
+import asyncio
+import bisect
+import functools
+import heapq
+import random
 import time
 import signal
 import sys
-from datetime import datetime
-from pathlib import Path
+from array import array
+from collections import deque
+from datetime import datetime, time as dtime, timedelta
 from zoneinfo import ZoneInfo
 
 from config import (
     POSTING_SCHEDULE,
     TIMEZONE,
-    CONTENT_QUEUE_FILE,
     CONTENT_QUEUE_SIZE,
     REPLY_CHECK_INTERVAL,
     FOLLOW_BACK_CHECK_INTERVAL,
@@ -22,63 +26,91 @@ from config import (
     MAX_NEWS_SHARES_PER_DAY,
     TOPIC_ENGAGE_INTERVAL,
 )
-from content_generator import generate_tweet, fetch_news_headlines, generate_news_take
+from content_generator import generate_tweet, generate_news_take
 from poster import post_content, get_post_count_today, check_credentials
-from engagement import reply_to_mentions, follow_back_new_followers, proactive_engage, topic_engage, viral_engage
+from engagement import (
+    reply_to_mentions, follow_back_new_followers, proactive_engage, topic_engage, viral_engage,
+    load_engagement_log, save_engagement_log,
+)
+from news_cache import get_headlines, headlines
+from queue_io import QueueItem, load_queue
 
+_TZ = ZoneInfo(TIMEZONE)
 
-def load_queue():
-    """Load the content queue from disk."""
-    queue_file = Path(CONTENT_QUEUE_FILE)
-    if queue_file.exists():
-        try:
-            items = json.loads(queue_file.read_text())
-            return [item for item in items if not item.get("posted", False)]
-        except json.JSONDecodeError:
-            pass
-    return []
+# Daemon sleeps until the next deadline, bounded so a new day's resets are picked up promptly
+# and never spins faster than the old fixed 15s tick when something is overdue
+_MIN_SLEEP = 15
+_MAX_IDLE_SLEEP = 55
+_POSTED_GC_INTERVAL = 3600  # How often the daemon drops yesterday's posted items from the queue
+
+_rng = random.Random()  # Our own generator — news picks don't share the module-level random state
+
+# A slot still posts this many minutes after its time — never before it, to avoid early posting
+POST_TOLERANCE_MINUTES = 7
+
+# Schedule flattened once at import into parallel columns: sorted minute-of-day
+# packed as raw uint16 (no per-row int objects) + matching categories
+_SCHEDULE_SORTED = sorted(POSTING_SCHEDULE, key=lambda slot: (slot[0], slot[1]))
+_SCHED_MINUTES = array("H", (h * 60 + m for h, m, _ in _SCHEDULE_SORTED))
+_SCHED_CATS = tuple(cat for _, _, cat in _SCHEDULE_SORTED)
+_ALL_CATEGORIES = tuple(sorted(set(_SCHED_CATS)))  # Every category the schedule posts
+
+
+def next_slot(now_minutes):
+    """Next scheduled (minute_of_day, category) strictly after now_minutes — wraps to tomorrow."""
+    idx = bisect.bisect_right(_SCHED_MINUTES, now_minutes) % len(_SCHED_MINUTES)
+    return _SCHED_MINUTES[idx], _SCHED_CATS[idx]
+
+
+def next_fire_utc(now_ts):
+    """Absolute timestamp and category of the next posting slot after now_ts."""
+    now = datetime.fromtimestamp(now_ts, _TZ)
+    now_minutes = now.hour * 60 + now.minute
+    minutes, category = next_slot(now_minutes)
+    day = now.date()
+    if minutes <= now_minutes:  # Wrapped around — slot is tomorrow
+        day += timedelta(days=1)
+    fire_at = datetime.combine(day, dtime(minutes // 60, minutes % 60), _TZ)
+    return fire_at.timestamp(), category
 
 
-def save_queue(queue):
-    """Save the content queue to disk."""
-    Path(CONTENT_QUEUE_FILE).write_text(json.dumps(queue, indent=2))
+def _queue_item(result, category, generated_at):
+    """Wrap a fresh generate_tweet() result as a queue item."""
+    return QueueItem.from_record({**result, "category": category, "generated_at": generated_at})
 
 
-def refill_queue(queue, target_size=None, max_generate=5):
-    """Generate content to fill the queue. max_generate limits per call to avoid blocking."""
+def refill_queue(store, target_size=None, max_generate=5, now_iso=None):
+    """Generate content to fill the queue. max_generate limits per call to avoid blocking.
+    now_iso stamps every item of the batch (defaults to the current time)."""
     if target_size is None:
         target_size = CONTENT_QUEUE_SIZE
+    if now_iso is None:
+        now_iso = datetime.now(_TZ).isoformat()
 
     categories_needed = []
-    existing_categories = [item["category"] for item in queue if not item.get("posted")]
-
-    all_categories = list(set(cat for _, _, cat in POSTING_SCHEDULE))
-    for cat in all_categories:
-        count = existing_categories.count(cat)
-        if count < 2:
-            categories_needed.extend([cat] * (2 - count))
+    for cat in _ALL_CATEGORIES:
+        need = 2 - store.count(cat)
+        if need > 0:
+            categories_needed.extend([cat] * need)
 
     if not categories_needed:
-        return queue
+        return store
 
     categories_needed = categories_needed[:max_generate]
     print(f"Generating {len(categories_needed)} new content items...")
 
     try:
-        news = fetch_news_headlines()
+        news = headlines()
     except Exception:
         news = []
 
     generated = 0
     for category in categories_needed:
-        if len(queue) >= target_size:
+        if store.unposted_count >= target_size:
             break
         try:
             result = generate_tweet(category, news_context=news)
-            result["category"] = category
-            result["generated_at"] = datetime.now().isoformat()
-            result["posted"] = False
-            queue.append(result)
+            store.append(_queue_item(result, category, now_iso))
             generated += 1
             print(f"  + [{category}] {result.get('text', '(thread)')[:50]}...")
         except Exception as e:
@@ -89,37 +121,169 @@ def refill_queue(queue, target_size=None, max_generate=5):
             print(f"  Error generating {category}: {e}")
 
     if generated > 0:
-        save_queue(queue)
-    return queue
+        store.changed()
+    return store
 
 
-def get_next_content(queue, category):
-    """Get the next unposted content item for a category."""
-    # Try exact category match first
-    for item in queue:
-        if item["category"] == category and not item.get("posted"):
-            return item
+def get_next_content(store, category):
+    """Take the next unposted content item for a category off the queue."""
     # NO FALLBACK — if we don't have the right category, generate on the fly
     # rather than posting wrong category content
-    return None
+    return store.pop(category)
+
+
+def mark_posted(store, item, posted_at):
+    """Mark a content item as posted at posted_at (an ISO timestamp)."""
+    item.posted = True
+    item.posted_at = posted_at
+    store.add_posted(item)
+    store.changed()
+
+
+# Engagement actions the daemon rotates through, in priority order:
+# name -> (phase, interval in seconds, what to print when it did something)
+VIRAL_ENGAGE_INTERVAL = 300
+_ENGAGEMENT_TIMERS = {
+    "mentions": (reply_to_mentions, REPLY_CHECK_INTERVAL, "[Engagement] Replied to {} mentions"),
+    "follow": (follow_back_new_followers, FOLLOW_BACK_CHECK_INTERVAL, "[Engagement] Followed back {} users"),
+    "proactive": (proactive_engage, PROACTIVE_REPLY_INTERVAL, "[Engagement] Sent {} proactive replies"),
+    "topic": (topic_engage, TOPIC_ENGAGE_INTERVAL, "[Topic Engage] Replied to {} trending tweets"),
+    "viral": (viral_engage, VIRAL_ENGAGE_INTERVAL, "[Viral Engage] Replied to {} viral tweets"),
+}
+_MAX_CONCURRENT_ENGAGEMENTS = 4  # Due actions share this many slots — keeps X API bursts bounded
+# When several jobs are due at once: posting first, then news, then engagement by priority
+_JOB_ORDER = {"post": 0, "news": 1, **{name: i + 2 for i, name in enumerate(_ENGAGEMENT_TIMERS)}}
 
 
-def mark_posted(queue, item):
-    """Mark a content item as posted."""
-    item["posted"] = True
-    item["posted_at"] = datetime.now().isoformat()
-    save_queue(queue)
+def todays_slots():
+    """A fresh day's posting schedule as a deque of (minute_of_day, category), earliest first."""
+    return deque(zip(_SCHED_MINUTES, _SCHED_CATS))
 
 
-def should_post_now(hour, minute, tolerance_minutes=7):
-    """Check if current time matches a schedule slot (within tolerance)."""
-    now = datetime.now(ZoneInfo(TIMEZONE))
-    target_minutes = hour * 60 + minute
+def post_due_slots(store, pending_slots, now):
+    """Post the slots from today's pending_slots that have come due by now (the daemon's tick time).
+    Handled slots are popped off the front, so no slot is ever looked at twice."""
+    now_iso = now.isoformat()
     current_minutes = now.hour * 60 + now.minute
-    diff = current_minutes - target_minutes
-    # Only post if we're within tolerance AFTER the scheduled time
-    # (not before, to avoid early posting)
-    return 0 <= diff <= tolerance_minutes
+    while pending_slots and pending_slots[0][0] <= current_minutes:
+        slot_minutes, category = pending_slots.popleft()
+        if current_minutes - slot_minutes > POST_TOLERANCE_MINUTES:
+            continue  # Missed by more than the tolerance (e.g. the daemon was down)
+
+        print(f"\n[{now.strftime('%H:%M')}] Time to post: {category}")
+
+        content = get_next_content(store, category)
+        if not content:
+            # The background generator keeps categories stocked — never stall a slot on the LLM
+            print(f"  No {category} in queue, skipping this slot")
+            continue
+
+        try:
+            post_content(content.to_record())
+            mark_posted(store, content, now_iso)
+            print(f"  Posted successfully!")
+        except Exception as e:
+            print(f"  Error posting: {e}")  # The slot is already popped and isn't retried
+            store.requeue(content)  # ...but the content goes back for the next one
+            store.changed()
+
+
+GENERATE_CHECK_INTERVAL = 60  # Seconds between the background generator's looks at the queue
+_GENERATE_RATE_LIMIT_BACKOFF = 600  # ...or after the LLM provider rate-limits us
+_MAX_CONCURRENT_GENERATIONS = 2
+_MIN_PER_CATEGORY = 2
+_MAX_GENERATE_PER_PASS = 5
+
+
+async def _generate_one(store, category, limit, generated_at):
+    async with limit:
+        news = await get_headlines()
+        result = await asyncio.to_thread(generate_tweet, category, news_context=news)
+    store.append(_queue_item(result, category, generated_at))
+    store.changed()
+    print(f"  + [{category}] {result.get('text', '(thread)')[:50]}...")
+
+
+async def _generator_loop(store):
+    """Daemon task: keep every scheduled category stocked with _MIN_PER_CATEGORY items,
+    so a posting slot only ever pops from the queue and never waits on the LLM."""
+    limit = asyncio.Semaphore(_MAX_CONCURRENT_GENERATIONS)
+    while True:
+        # An over-full queue (e.g. CONTENT_QUEUE_SIZE lowered) leaves no room — never a negative slice
+        room = max(0, min(_MAX_GENERATE_PER_PASS, CONTENT_QUEUE_SIZE - store.unposted_count))
+        needed = [cat for cat in _ALL_CATEGORIES for _ in range(_MIN_PER_CATEGORY - store.count(cat))][:room]
+        pause = GENERATE_CHECK_INTERVAL
+        if needed:
+            print(f"Generating {len(needed)} new content items...")
+            generated_at = datetime.now(_TZ).isoformat()  # One stamp for the whole pass
+            results = await asyncio.gather(*(_generate_one(store, cat, limit, generated_at) for cat in needed),
+                                           return_exceptions=True)
+            for cat, result in zip(needed, results):
+                if isinstance(result, Exception):
+                    err = str(result).lower()
+                    if "rate" in err or "limit" in err or "daily" in err:
+                        pause = _GENERATE_RATE_LIMIT_BACKOFF
+                    print(f"  Error generating {cat}: {result}")
+        await asyncio.sleep(pause)
+
+
+def run_engagement_action(name, log=None):
+    """Run one engagement phase by timer name and report what it did. Returns True on success.
+    Given the daemon's shared engagement log, the phase works on it and it's saved afterwards —
+    so dedup and the hourly caps see every action's replies, not just their own."""
+    phase, _, done = _ENGAGEMENT_TIMERS[name]
+    try:
+        count = phase(log)
+        if log is not None:
+            save_engagement_log(log)
+        if count:
+            print(f"  {done.format(count)}")
+        return True
+    except Exception as e:
+        print(f"  [{name}] Error: {e}")
+        return False
+
+
+async def _engage(name, due_ts, started_ts, limit, timers, log):
+    """One engagement action under the concurrency limit. Its timer only moves on after
+    a success — a failed action stays due and is retried on the next wake-up."""
+    async with limit:
+        ok = await asyncio.to_thread(run_engagement_action, name, log)
+    heapq.heappush(timers, (started_ts + _ENGAGEMENT_TIMERS[name][1] if ok else due_ts, name))
+
+
+async def _run_then_rearm(job, work, next_due, timers):
+    """Run a posting or news job in a worker thread, then push it back on the heap — it is never
+    due again while it is still running."""
+    try:
+        await asyncio.to_thread(work)
+    except Exception as e:
+        print(f"  [{job}] Error: {e}")
+    finally:
+        heapq.heappush(timers, (next_due, job))
+
+
+def _spawn(running, coro):
+    """Start coro as a task, held in running until it is done so it isn't garbage-collected."""
+    task = asyncio.create_task(coro)
+    running.add(task)
+    task.add_done_callback(running.discard)
+
+
+def share_news(state):
+    """Share breaking news with a take. state holds today's share count."""
+    try:
+        news = headlines()
+        if news:
+            # Pick a random recent headline — one of the first 15, without slicing a copy
+            headline = news[_rng.randrange(min(15, len(news)))]
+            news_content = generate_news_take(headline)
+            if news_content:
+                post_content(news_content)
+                state["shared_today"] += 1
+                print(f"  [News] Shared: {headline['title'][:50]}...")
+    except Exception as e:
+        print(f"  [News] Error sharing news: {e}")
 
 
 def run_daemon():
@@ -135,174 +299,94 @@ def run_daemon():
         print("\nERROR: API credentials not configured. Exiting.")
         sys.exit(1)
 
-    queue = load_queue()
-    unposted_count = len([q for q in queue if not q.get("posted")])
-    if unposted_count < 5:
-        queue = refill_queue(queue, max_generate=5)
-    posted_slots = set()
-
-    # Engagement timers
-    last_reply_check = 0
-    last_follow_check = 0
-    last_proactive = 0
-    last_news_share = 0
-    last_topic_engage = 0
-    last_viral_engage = 0
-    news_shares_today = 0
-    news_cache = []
-    news_cache_time = 0
-
-    def handle_signal(sig, frame):
-        print("\nShutting down gracefully...")
-        save_queue(queue)
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, handle_signal)
-    signal.signal(signal.SIGTERM, handle_signal)
-
-    unposted = [q for q in queue if not q.get("posted")]
-    print(f"\nQueue size: {len(unposted)} items")
+    asyncio.run(_daemon())
+
+
+async def _daemon():
+    """The daemon's event loop. Every job (posting slots, each engagement action, news sharing)
+    sits in one min-heap keyed by when it is next due; the loop sleeps until the earliest and
+    starts everything due as its own task. A job goes back on the heap when it finishes, so a
+    slow engagement action never holds up a posting slot and nothing runs twice at once."""
+    store = load_queue(_ALL_CATEGORIES)
+    engagement_log = load_engagement_log()  # One log for every engagement action, like a full cycle
+    current_day = None
+    last_gc = 0.0
+    pending_slots = deque()
+
+    news = {"shared_today": 0}
+
+    # Delivered through the event loop, so a signal never interrupts a coroutine mid-step —
+    # it just wakes the loop, which finishes the jobs in flight and saves on the way out
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    # Held so the tasks aren't garbage-collected
+    saver = asyncio.create_task(store.saver())
+    generator = asyncio.create_task(_generator_loop(store))
+
+    print(f"\nQueue size: {store.unposted_count} items")
     print(f"Posts today: {get_post_count_today()}")
+    now = datetime.now(_TZ)
+    slot_minutes, slot_category = next_slot(now.hour * 60 + now.minute)
+    print(f"Next slot: {slot_minutes // 60:02d}:{slot_minutes % 60:02d} ({slot_category})")
     print("\nRunning... (posting + engagement)\n")
 
-    while True:
-        now = datetime.now(ZoneInfo(TIMEZONE))
+    # (due_ts, job) — everything is due immediately on startup, like the old zeroed timers
+    timers = [(0.0, "post"), (0.0, "news")] + [(0.0, name) for name in _ENGAGEMENT_TIMERS]
+    heapq.heapify(timers)
+    engagement_limit = asyncio.Semaphore(_MAX_CONCURRENT_ENGAGEMENTS)
+    running = set()
+
+    while not stop.is_set():
+        now = datetime.now(_TZ)
         now_ts = time.time()
-        today_key = now.date().isoformat()
-
-        # Reset posted_slots at midnight
-        if not any(today_key in s for s in posted_slots):
-            posted_slots.clear()
-
-        # ==========================================
-        # POSTING: Check ALL schedule slots
-        # ==========================================
-        for hour, minute, category in POSTING_SCHEDULE:
-            slot_key = f"{today_key}-{hour:02d}:{minute:02d}-{category}"
-
-            if slot_key in posted_slots:
-                continue
-
-            if should_post_now(hour, minute):
-                print(f"\n[{now.strftime('%H:%M')}] Time to post: {category}")
-
-                content = get_next_content(queue, category)
-                if not content:
-                    # Generate on the fly for this specific category
-                    print(f"  No {category} in queue, generating fresh...")
-                    try:
-                        news = fetch_news_headlines()
-                        result = generate_tweet(category, news_context=news)
-                        result["category"] = category
-                        result["generated_at"] = datetime.now().isoformat()
-                        result["posted"] = False
-                        queue.append(result)
-                        save_queue(queue)
-                        content = result
-                    except Exception as e:
-                        print(f"  Failed to generate {category}: {e}")
-                        posted_slots.add(slot_key)  # Skip this slot
-                        continue
-
-                if content:
-                    try:
-                        post_content(content)
-                        mark_posted(queue, content)
-                        posted_slots.add(slot_key)
-                        print(f"  Posted successfully!")
-                    except Exception as e:
-                        print(f"  Error posting: {e}")
-                        posted_slots.add(slot_key)  # Don't retry failed posts
-
-        # ==========================================
-        # ENGAGEMENT: Rotate between engagement types
-        # Each loop picks ONE engagement action to avoid
-        # burning all API budget at once
-        # ==========================================
-        engagement_actions = []
-
-        if now_ts - last_reply_check >= REPLY_CHECK_INTERVAL:
-            engagement_actions.append("mentions")
-        if now_ts - last_follow_check >= FOLLOW_BACK_CHECK_INTERVAL:
-            engagement_actions.append("follow")
-        if now_ts - last_proactive >= PROACTIVE_REPLY_INTERVAL:
-            engagement_actions.append("proactive")
-        if now_ts - last_topic_engage >= TOPIC_ENGAGE_INTERVAL:
-            engagement_actions.append("topic")
-        if now_ts - last_viral_engage >= 300:
-            engagement_actions.append("viral")
-
-        # Do up to 2 engagement actions per loop (spread the load)
-        for action in engagement_actions[:2]:
-            try:
-                if action == "mentions":
-                    replied = reply_to_mentions()
-                    if replied:
-                        print(f"  [Engagement] Replied to {replied} mentions")
-                    last_reply_check = now_ts
-                elif action == "follow":
-                    followed = follow_back_new_followers()
-                    if followed:
-                        print(f"  [Engagement] Followed back {followed} users")
-                    last_follow_check = now_ts
-                elif action == "proactive":
-                    proactive = proactive_engage()
-                    if proactive:
-                        print(f"  [Engagement] Sent {proactive} proactive replies")
-                    last_proactive = now_ts
-                elif action == "topic":
-                    topic_replied = topic_engage()
-                    if topic_replied:
-                        print(f"  [Topic Engage] Replied to {topic_replied} trending tweets")
-                    last_topic_engage = now_ts
-                elif action == "viral":
-                    viral_replied = viral_engage()
-                    if viral_replied:
-                        print(f"  [Viral Engage] Replied to {viral_replied} viral tweets")
-                    last_viral_engage = now_ts
-            except Exception as e:
-                print(f"  [{action}] Error: {e}")
-
-        # ==========================================
-        # NEWS SHARING: Share breaking news with take
-        # ==========================================
-        if now_ts - last_news_share >= NEWS_SHARE_INTERVAL and news_shares_today < MAX_NEWS_SHARES_PER_DAY:
-            try:
-                # Refresh news cache every 30 min
-                if now_ts - news_cache_time > 1800 or not news_cache:
-                    news_cache = fetch_news_headlines()
-                    news_cache_time = now_ts
-
-                if news_cache:
-                    import random
-                    # Pick a random recent headline
-                    headline = random.choice(news_cache[:15])
-                    news_content = generate_news_take(headline)
-                    if news_content:
-                        post_content(news_content)
-                        news_shares_today += 1
-                        print(f"  [News] Shared: {headline['title'][:50]}...")
-            except Exception as e:
-                print(f"  [News] Error sharing news: {e}")
-            last_news_share = now_ts
-
-        # Reset news_shares_today at midnight
-        if now.hour == 0 and now.minute < 1:
-            news_shares_today = 0
-
-        # ==========================================
-        # QUEUE: Refill if running low (gradual)
-        # ==========================================
-        unposted = [q for q in queue if not q.get("posted")]
-        if len(unposted) < 8:
-            print("Queue running low, generating more...")
-            queue = refill_queue(queue, max_generate=5)
+        today_iso = now.isoformat()[:10]  # Formatted once per tick
+
+        # A new day starts with the full schedule and a fresh news-share allowance
+        if today_iso != current_day:
+            pending_slots = todays_slots()
+            news["shared_today"] = 0
+            current_day = today_iso
+
+        due = []
+        while timers and timers[0][0] <= now_ts:
+            due.append(heapq.heappop(timers))
+
+        # Posting, news and every due engagement action run side by side, each on its own task
+        for due_ts, job in sorted(due, key=lambda t: _JOB_ORDER[t[1]]):
+            if job == "post":
+                next_post_ts, _ = next_fire_utc(now_ts)
+                _spawn(running, _run_then_rearm(
+                    "post", functools.partial(post_due_slots, store, pending_slots, now), next_post_ts, timers))
+            elif job == "news":
+                next_news_ts = now_ts + NEWS_SHARE_INTERVAL
+                if news["shared_today"] < MAX_NEWS_SHARES_PER_DAY:
+                    _spawn(running, _run_then_rearm("news", functools.partial(share_news, news), next_news_ts, timers))
+                else:
+                    heapq.heappush(timers, (next_news_ts, "news"))
+            else:
+                _spawn(running, _engage(job, due_ts, now_ts, engagement_limit, timers, engagement_log))
 
         # Clean old posted items from queue to keep memory lean
-        queue = [q for q in queue if not q.get("posted") or
-                 q.get("posted_at", "") > (datetime.now().isoformat()[:10])]
+        if now_ts - last_gc > _POSTED_GC_INTERVAL:
+            store.gc_posted(today_iso)
+            last_gc = now_ts
+
+        # Sleep until the earliest job is due, bounded so a new day is noticed promptly —
+        # or until a shutdown signal, whichever comes first. Every job may be running (none queued)
+        next_due = timers[0][0] if timers else now_ts + _MAX_IDLE_SLEEP
+        try:
+            await asyncio.wait_for(stop.wait(), min(_MAX_IDLE_SLEEP, max(_MIN_SLEEP, next_due - time.time())))
+        except asyncio.TimeoutError:
+            pass
 
-        time.sleep(15)  # Check every 15 seconds — stay aggressive
+    print("\nShutting down gracefully...")
+    if running:  # Let the jobs in flight finish, so the final save includes what they did
+        await asyncio.wait(running)
+    generator.cancel()
+    saver.cancel()
+    await store.flush()
 
 
 def post_now(category=None):
@@ -311,24 +395,22 @@ def post_now(category=None):
         print("ERROR: API credentials not configured.")
         return
 
-    queue = load_queue()
+    store = load_queue()
 
     if category:
-        content = get_next_content(queue, category)
+        content = get_next_content(store, category)
     else:
-        content = next((q for q in queue if not q.get("posted")), None)
+        content = store.pop_oldest()
 
-    if not content:
+    queued = content is not None
+    if not queued:
         print(f"No content in queue for {category or 'any'}. Generating...")
-        news = fetch_news_headlines()
         cat = category or "hot_take"
-        content = generate_tweet(cat, news_context=news)
-        content["category"] = cat
-        content["generated_at"] = datetime.now().isoformat()
+        content = _queue_item(generate_tweet(cat, news_context=headlines()), cat, datetime.now(_TZ).isoformat())
 
-    post_content(content)
-    if "posted" in content:
-        mark_posted(queue, content)
+    post_content(content.to_record())
+    if queued:
+        mark_posted(store, content, datetime.now(_TZ).isoformat())
     print("Done!")
 
 
@@ -350,16 +432,14 @@ if __name__ == "__main__":
     elif args.post_now:
         post_now(args.post_now)
     elif args.fill_queue:
-        queue = load_queue()
-        queue = refill_queue(queue, target_size=CONTENT_QUEUE_SIZE)
-        print(f"\nQueue now has {len([q for q in queue if not q.get('posted')])} unposted items")
+        store = refill_queue(load_queue(), target_size=CONTENT_QUEUE_SIZE)
+        print(f"\nQueue now has {store.unposted_count} unposted items")
     elif args.show_queue:
-        queue = load_queue()
-        unposted = [q for q in queue if not q.get("posted")]
+        unposted = load_queue().unposted()
         print(f"Queue: {len(unposted)} unposted items\n")
         for i, item in enumerate(unposted[:20]):
-            cat = item.get("category", "unknown")
-            text = item.get("text", item.get("tweets", [""])[0])[:60]
+            cat = item.category
+            text = (item.text or (item.tweets or [""])[0])[:60]
             print(f"  [{i+1}] ({cat}) {text}...")
     elif args.engage:
         from engagement import run_engagement_cycle
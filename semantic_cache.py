@@ -0,0 +1,170 @@
+"""
+Semantic cache for LLM answers — reuse a previous answer when a new prompt means
+the same thing as one we've already paid for.
+Embeddings come from a small local sentence-transformers model when it's installed
+(pip install sentence-transformers); without it the cache still serves exact repeats.
+numpy and the model are only imported on the first semantic lookup, and the cache
+file on first use, so importing this module (or building a cache) costs nothing.
+"""
+import atexit
+import functools
+import hashlib
+import importlib.util
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from storage import write_atomic
+
+EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SAVE_INTERVAL = 30  # Seconds between rewrites of the cache file — puts in between just mark it dirty
+
+# Probed without importing — sentence-transformers pulls in torch
+SEMANTIC = all(importlib.util.find_spec(name) is not None for name in ("numpy", "sentence_transformers"))
+
+
+@functools.lru_cache(maxsize=1)
+def _model():
+    """Load the embedding model once, on first semantic lookup."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBED_MODEL)
+
+
+@functools.lru_cache(maxsize=256)
+def _embed(text):
+    """Unit-length float32 embedding, so a dot product is cosine similarity."""
+    import numpy as np
+    return _model().encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+def _quantize(vec):
+    """Symmetric int8 quantization: vec ~= q * scale / 127. A quarter of the float32 size."""
+    import numpy as np
+    scale = float(np.abs(vec).max()) or 1.0
+    return np.round(vec * (127 / scale)).astype(np.int8), scale
+
+
+def _digest(text):
+    return hashlib.sha1(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+class SemanticCache:
+    """Disk-backed LRU of (text, context) -> answer.
+
+    A lookup hits when context matches exactly and text is an exact repeat or
+    (with embeddings available) has cosine similarity >= threshold to a cached text.
+    semantic=False keeps it to exact repeats — for answers where a near miss would be wrong.
+    """
+
+    def __init__(self, path, threshold=0.95, max_entries=5000, max_age=6 * 3600, semantic=True):
+        self.path = str(path)
+        self.threshold = threshold
+        self.semantic = semantic and SEMANTIC
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # key -> (context_digest, int8 embedding or None, scale, answer, stored_at), oldest first
+        self._entries = None  # Loaded on first get/put
+        self._stacked = None  # (keys, int8 matrix, scales) per context, rebuilt after any change
+        self._dirty = False
+        self._saved_at = 0.0
+        atexit.register(self.flush)  # Whatever the last SAVE_INTERVAL held back
+
+    _FORMAT = 2  # Bumped when the entry layout changes — older files are discarded
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        try:
+            with open(self.path, "rb") as f:
+                saved = pickle.load(f)
+        except Exception:  # Missing, corrupt or written by other library versions — start empty
+            return
+        if isinstance(saved, dict) and saved.get("format") == self._FORMAT:
+            self._entries = saved["entries"]
+
+    def _save(self):
+        data = pickle.dumps({"format": self._FORMAT, "entries": self._entries}, protocol=pickle.HIGHEST_PROTOCOL)
+        write_atomic(self.path, data)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def flush(self):
+        """Write pending puts to disk now."""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"  Could not save semantic cache: {e}")
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        stale = [key for key, entry in self._entries.items() if entry[4] < cutoff]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._stacked = None
+
+    def _stack(self):
+        """Group embeddings by context into one int8 matrix each — a lookup is one mat-vec product."""
+        import numpy as np
+        if self._stacked is None:
+            groups = {}
+            for key, (ctx, q, scale, _, _) in self._entries.items():
+                if q is not None:
+                    keys, rows, scales = groups.setdefault(ctx, ([], [], []))
+                    keys.append(key)
+                    rows.append(q)
+                    scales.append(scale)
+            self._stacked = {
+                ctx: (keys, np.stack(rows), np.array(scales, dtype=np.float32))
+                for ctx, (keys, rows, scales) in groups.items()
+            }
+        return self._stacked
+
+    def get(self, text, context=""):
+        """Cached answer for text under context, or None."""
+        ctx = _digest(context)
+        key = ctx + _digest(text)
+        with self._lock:
+            self._load()
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None and self.semantic:
+                keys, matrix, scales = self._stack().get(ctx, ((), None, None))
+                if keys:
+                    import numpy as np
+                    q, scale = _quantize(_embed(text))
+                    # int8 x int8 accumulated in int32, then rescaled back to cosine similarity
+                    dots = np.einsum("ij,j->i", matrix, q, dtype=np.int32)
+                    sims = dots * scales * (scale / (127 * 127))
+                    best = int(sims.argmax())
+                    if sims[best] >= self.threshold:
+                        key = keys[best]
+                        entry = self._entries[key]
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[3]
+
+    def put(self, text, answer, context=""):
+        """Store answer for text under context. The file is rewritten at most every SAVE_INTERVAL."""
+        ctx = _digest(context)
+        q, scale = _quantize(_embed(text)) if self.semantic else (None, 1.0)
+        key = ctx + _digest(text)
+        with self._lock:
+            self._load()
+            self._entries[key] = (ctx, q, scale, answer, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stacked = None
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"  Could not save semantic cache: {e}")
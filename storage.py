@@ -0,0 +1,223 @@
+"""
+Line-delimited JSON (NDJSON) storage for append-heavy logs.
+One record per line: appending is O(1) instead of re-reading and rewriting the whole file.
+"""
+import fcntl
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson
+
+    def dumps(obj):
+        """Serialize to compact JSON bytes (orjson — C extension, several times faster)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+except ImportError:  # stdlib fallback — same format, just slower
+    def dumps(obj):
+        """Serialize to compact JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    loads = json.loads
+
+
+_TAIL_CHUNK = 4096  # Bytes read per step when scanning a file backwards from its end
+
+# Long-lived O_APPEND descriptors, one per log path — each append is a single os.write
+_APPEND_FDS = {}
+
+
+def _append_fd(path):
+    """Open (once) and cache an append-only descriptor for path."""
+    fd = _APPEND_FDS.get(path)
+    if fd is None:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        _APPEND_FDS[path] = fd
+    return fd
+
+
+def close_append_fd(path):
+    """Drop the cached descriptor — call after replacing or removing the file at path."""
+    fd = _APPEND_FDS.pop(path, None)
+    if fd is not None:
+        os.close(fd)
+
+
+def append_record(path, record):
+    """Append one record as a single JSON line. flock keeps the daemon and CLI from interleaving."""
+    append_records(path, (record,))
+
+
+def _locked_append_fd(path):
+    """The cached descriptor for path, flocked. If the file at path was replaced meanwhile (another
+    process compacted it), the descriptor is reopened first — a write never lands in an unlinked file."""
+    while True:
+        fd = _append_fd(path)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            held, current = os.fstat(fd), os.stat(path)
+            if (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino):
+                return fd
+        except FileNotFoundError:  # Removed — reopening creates it afresh
+            pass
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        close_append_fd(path)
+
+
+def append_records(path, records):
+    """Append several records with one locked write — a batch lands together or not at all."""
+    line = b"".join(dumps(record) + b"\n" for record in records)
+    if not line:
+        return
+    fd = _locked_append_fd(path)
+    try:
+        os.write(fd, line)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def iter_records(path):
+    """Yield records from an NDJSON file in order. Skips blank or half-written lines."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:  # orjson.JSONDecodeError and json.JSONDecodeError both subclass it
+                continue
+
+
+def count_records(path, start=0):
+    """Number of lines in an NDJSON file from byte offset start on, counted in raw chunks without parsing."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 16), b""))
+    except FileNotFoundError:
+        return 0
+
+
+def bisect_records(path, key, target):
+    """Byte offset of the first line whose record has key(record) >= target, in an NDJSON file
+    sorted by key (e.g. an append-only log by timestamp). Binary search over byte positions —
+    each probe parses a single line. A half-written line only ever sits at the end, so unparsable
+    lines count as at or above target."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        lo, hi = 0, f.seek(0, os.SEEK_END)  # Both always at line starts (or EOF)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid:
+                f.seek(mid - 1)
+                f.readline()  # On to the first line starting at or after mid
+            start = f.tell()
+            if start >= hi:  # No line starts in [mid, hi) — probe the one at lo instead
+                start = lo
+                f.seek(lo)
+            line = f.readline()
+            try:
+                below = key(loads(line)) < target
+            except ValueError:
+                below = False
+            if below:
+                lo = f.tell()
+            else:
+                hi = start
+        return lo
+
+
+def last_record(path):
+    """The last complete record of an NDJSON file, read backwards from the end. None if there isn't one."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            lines = tail.split(b"\n")
+            # Unless we've reached the start, the first line may begin before what we've read
+            for line in reversed(lines if pos == 0 else lines[1:]):
+                if line.strip():
+                    try:
+                        return loads(line)
+                    except ValueError:  # Half-written line
+                        continue
+            tail = lines[0] if pos else b""
+    return None
+
+
+def write_atomic(path, data):
+    """Replace the file at path with data (bytes): written to a temp file, fsynced, then renamed
+    over the original — after a crash it holds the old contents or the new, never a torn mix."""
+    path = str(path)
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:  # os.write may take less than everything — carry on from where it stopped
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def rewrite_records(path, records):
+    """Atomically replace an NDJSON file with records (write_atomic — fsynced temp file + rename).
+    Holds the append lock on the old file throughout, so appenders in other processes wait
+    and then notice the new file instead of writing into the replaced one."""
+    path = str(path)
+    data = b"".join(dumps(record) + b"\n" for record in records)
+    fd = _locked_append_fd(path)
+    try:
+        write_atomic(path, data)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        close_append_fd(path)  # The cached descriptor still points at the old file
+
+
+def load_counts(counts_path, path, kinds):
+    """{kind: event count} for an NDJSON event log of {"kind", ...} records — read from the small
+    sidecar at counts_path when there is one, else tallied in a single streamed pass and saved there."""
+    try:
+        return loads(Path(counts_path).read_bytes())
+    except (OSError, ValueError):
+        pass
+    counts = dict.fromkeys(kinds, 0)
+    for record in iter_records(path):
+        kind = record.get("kind")
+        if kind in counts:
+            counts[kind] += 1
+    try:
+        write_atomic(counts_path, dumps(counts))
+    except OSError:
+        pass
+    return counts
+
+
+def migrate_json_array(old_path, new_path):
+    """One-time conversion of a legacy JSON-array log into NDJSON. Keeps the old file as .bak."""
+    old_path, new_path = Path(old_path), Path(new_path)
+    if new_path.exists() or not old_path.exists():
+        return
+    try:
+        records = loads(old_path.read_bytes())
+    except ValueError:
+        records = []
+    write_atomic(new_path, b"".join(dumps(record) + b"\n" for record in records))
+    old_path.rename(old_path.with_name(old_path.name + ".bak"))
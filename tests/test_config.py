@@ -0,0 +1,35 @@
+import re
+from pathlib import Path
+
+from config import parse_env
+
+README = Path(__file__).resolve().parent.parent / "README.md"
+
+
+def _readme_env_sample():
+    """The .env block from the README's setup steps."""
+    blocks = re.findall(r"```\n(.*?)```", README.read_text(), re.S)
+    return next(block for block in blocks if "GROQ_API_KEY=" in block)
+
+
+def test_readme_sample_parses_without_inline_comments():
+    env = parse_env(_readme_env_sample().encode())
+    assert set(env) == {
+        "X_API_KEY", "X_API_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET",
+        "X_BEARER_TOKEN", "GROQ_API_KEY", "ANTHROPIC_API_KEY",
+    }
+    assert all(value == "..." for value in env.values())
+
+
+def test_inline_comment_dropped_from_real_looking_key():
+    env = parse_env(b"GROQ_API_KEY=gsk_abc          # Primary (free)\n")
+    assert env == {"GROQ_API_KEY": "gsk_abc"}
+
+
+def test_hash_without_leading_space_is_kept():
+    assert parse_env(b"TOKEN=abc#def\n") == {"TOKEN": "abc#def"}
+
+
+def test_quoted_values_are_verbatim():
+    env = parse_env(b"A=\"x # not a comment\"  # comment\nexport B='y'\n# skipped\n\nC=\n")
+    assert env == {"A": "x # not a comment", "B": "y", "C": ""}
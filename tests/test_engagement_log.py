@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import engagement
+from storage import count_records, iter_records, load_counts
+
+
+@pytest.fixture
+def log_files(tmp_path, monkeypatch):
+    """Point the engagement log, its legacy file and the counts sidecar at tmp_path."""
+    monkeypatch.setattr(engagement, "ENGAGEMENT_LOG_FILE", tmp_path / "engagement_log.ndjson")
+    monkeypatch.setattr(engagement, "ENGAGEMENT_LOG_PATH", str(tmp_path / "engagement_log.ndjson"))
+    monkeypatch.setattr(engagement, "LEGACY_ENGAGEMENT_LOG_FILE", tmp_path / "engagement_log.json")
+    monkeypatch.setattr(engagement, "ENGAGEMENT_COUNTS_FILE", tmp_path / "engagement_counts.json")
+    engagement._migrate_engagement_log.cache_clear()
+    yield tmp_path
+    engagement._migrate_engagement_log.cache_clear()
+
+
+def _reply(tweet_id, author, age=timedelta()):
+    return {"tweet_id": tweet_id, "author": author, "timestamp": (datetime.now(timezone.utc) - age).isoformat()}
+
+
+def _persisted(log):
+    return {key: value for key, value in log.items() if not key.startswith("_")}
+
+
+def test_save_appends_only_new_events_and_replays(log_files):
+    log = engagement.load_engagement_log()
+    engagement.record_reply(log, "replies_sent", _reply("1", "alice"))
+    engagement.record_follow(log, "42")
+    log["last_mention_id"] = "100"
+    engagement.save_engagement_log(log)
+    assert count_records(engagement.ENGAGEMENT_LOG_PATH) == 3
+
+    engagement.record_reply(log, "replies_sent", _reply("2", "bob"))
+    engagement.save_engagement_log(log)
+    assert count_records(engagement.ENGAGEMENT_LOG_PATH) == 4  # Just the new reply appended
+
+    engagement.save_engagement_log(log)  # Nothing changed — nothing written
+    assert count_records(engagement.ENGAGEMENT_LOG_PATH) == 4
+
+    reloaded = engagement.load_engagement_log()
+    assert _persisted(reloaded) == _persisted(log)
+    assert engagement.get_all_replied_tweet_ids(reloaded) == {"1", "2"}
+    assert engagement.get_replies_this_hour(reloaded) == 2
+    assert engagement.recently_replied_to_author(reloaded, "Alice")
+
+
+def test_latest_scalar_event_wins_on_replay(log_files):
+    log = engagement.load_engagement_log()
+    for mention_id in ("1", "2", "3"):
+        log["last_mention_id"] = mention_id
+        engagement.save_engagement_log(log)
+    assert engagement.load_engagement_log()["last_mention_id"] == "3"
+
+
+def test_trimmed_lists_compact_the_file(log_files):
+    log = engagement.load_engagement_log()
+    engagement.record_reply(log, "replies_sent", _reply("old", "carol", age=timedelta(days=10)))
+    engagement.record_reply(log, "replies_sent", _reply("new", "dave"))
+    engagement.save_engagement_log(log)
+
+    engagement.cleanup_log(log)  # Drops replies older than 7 days
+    engagement.save_engagement_log(log)
+    events = list(iter_records(engagement.ENGAGEMENT_LOG_PATH))
+    assert [event["entry"]["tweet_id"] for event in events] == ["new"]
+    assert engagement.load_engagement_log()["replies_sent"] == log["replies_sent"]
+
+
+def test_compaction_keeps_shared_indexes_live(log_files):
+    log = engagement.load_engagement_log()
+    replied = engagement.get_all_replied_tweet_ids(log)  # What a running phase holds on to
+    engagement.compact_engagement_log(log)
+    engagement.record_reply(log, "replies_sent", _reply("7", "erin"))
+    assert "7" in replied
+
+
+def test_counts_sidecar_matches_the_log(log_files):
+    log = engagement.load_engagement_log()
+    engagement.record_reply(log, "replies_sent", _reply("1", "alice"))
+    engagement.record_follow(log, "42")
+    engagement.save_engagement_log(log)
+    expected = {"followed_back": 1, "replies_sent": 1, "proactive_replies": 0}
+    counts = load_counts(engagement.ENGAGEMENT_COUNTS_FILE, engagement.ENGAGEMENT_LOG_PATH, tuple(expected))
+    assert counts == expected
+    # Without the sidecar the counts come from the event stream itself
+    engagement.ENGAGEMENT_COUNTS_FILE.unlink()
+    assert load_counts(engagement.ENGAGEMENT_COUNTS_FILE, engagement.ENGAGEMENT_LOG_PATH, tuple(expected)) == expected
+
+
+def test_legacy_json_log_is_migrated(log_files):
+    legacy = engagement.LEGACY_ENGAGEMENT_LOG_FILE
+    legacy.write_text('{"last_mention_id": "9", "followed_back": ["1", "2"], "replies_sent": [], "proactive_replies": []}')
+    log = engagement.load_engagement_log()
+    assert log["last_mention_id"] == "9"
+    assert log["followed_back"] == ["1", "2"]
+    assert not legacy.exists()
+    assert legacy.with_name(legacy.name + ".bak").exists()
+
+
+def test_reply_claims_are_exclusive(log_files, monkeypatch):
+    monkeypatch.setattr(engagement, "MAX_REPLIES_PER_HOUR", 2)
+    log = engagement.load_engagement_log()
+    assert engagement.reserve_reply(log, "1", "alice")
+    assert not engagement.reserve_reply(log, "1", "bob")  # Same tweet in flight
+    assert not engagement.reserve_reply(log, "2", "ALICE")  # Same author in flight
+    assert engagement.reserve_reply(log, "3", "bob")
+    assert not engagement.reserve_reply(log, "4", "carol")  # Hourly cap counts in-flight replies
+    engagement.record_reply(log, "replies_sent", _reply("1", "alice"))
+    engagement.release_reply(log, "1")
+    engagement.release_reply(log, "3")
+    assert not engagement.reserve_reply(log, "1", "dave")  # Already replied to
+    assert engagement.reserve_reply(log, "5", "dave")
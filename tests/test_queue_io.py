@@ -0,0 +1,66 @@
+import queue_io
+from queue_io import QueueItem, QueueStore, load_queue, save_queue
+
+
+def _item(category, generated_at, **fields):
+    return QueueItem.from_record({"type": "single", "category": category, "text": f"{category} {generated_at}",
+                                  "generated_at": generated_at, **fields})
+
+
+def test_pop_is_fifo_per_category_and_counts_follow():
+    store = QueueStore([_item("a", "1"), _item("b", "2"), _item("a", "3")], categories=("a", "b", "c"))
+    assert (store.count("a"), store.count("b"), store.count("c"), store.unposted_count) == (2, 1, 0, 3)
+    assert store.pop("a").generated_at == "1"
+    assert store.pop("c") is None
+    assert store.pop_oldest().generated_at == "2"
+    assert store.unposted_count == 1
+    assert store.pop("a").generated_at == "3"
+    assert store.pop_oldest() is None
+    assert store.unposted_count == 0
+
+
+def test_requeue_puts_the_item_back_in_front():
+    store = QueueStore([_item("a", "1"), _item("a", "2")])
+    first = store.pop("a")
+    store.requeue(first)
+    assert store.unposted_count == 2
+    assert [item.generated_at for item in store.unposted()] == ["1", "2"]
+
+
+def test_gc_posted_drops_only_earlier_days():
+    store = QueueStore()
+    for posted_at in ("2026-10-13T09:00", "2026-10-14T23:59", "2026-10-15T00:00", "2026-10-15T12:00"):
+        item = _item("a", posted_at)
+        item.posted, item.posted_at = True, posted_at
+        store.add_posted(item)
+    store.gc_posted("2026-10-15")
+    assert [item.posted_at for item in store.posted_log] == ["2026-10-15T00:00", "2026-10-15T12:00"]
+
+
+def test_item_record_round_trip_keeps_extra_fields():
+    record = {"type": "thread", "category": "thread", "tweets": ["1/", "2/"], "generated_at": "x",
+              "posted": False, "posted_at": None, "text": None, "quote_tweet_id": "99"}
+    item = QueueItem.from_record(record)
+    assert item.extra == {"quote_tweet_id": "99"}
+    assert item.to_record() == record
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(queue_io, "CONTENT_QUEUE_FILE", tmp_path / "content_queue.json")
+    store = QueueStore([_item("a", "1"), _item("b", "2", source_link="https://example.com")])
+    posted = store.pop("a")
+    posted.posted, posted.posted_at = True, "2026-10-15T08:00"
+    store.add_posted(posted)
+    save_queue(store)
+
+    loaded = load_queue(categories=("a", "b"))  # Posted items are dropped on load
+    assert loaded.unposted_count == 1
+    assert loaded.count("a") == 0
+    assert loaded.pop("b").to_record() == _item("b", "2", source_link="https://example.com").to_record()
+
+
+def test_load_queue_tolerates_a_corrupt_file(tmp_path, monkeypatch):
+    path = tmp_path / "content_queue.json"
+    path.write_bytes(b"[{\"type\": ")
+    monkeypatch.setattr(queue_io, "CONTENT_QUEUE_FILE", path)
+    assert load_queue(categories=("a",)).unposted_count == 0
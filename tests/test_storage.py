@@ -0,0 +1,69 @@
+import os
+import random
+
+from storage import append_record, append_records, bisect_records, iter_records, last_record, rewrite_records
+
+
+def _write_lines(path, lines):
+    path.write_bytes(b"".join(line + b"\n" for line in lines))
+
+
+def test_bisect_records_matches_brute_force(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / "log.ndjson"
+    for _ in range(200):
+        keys = sorted(rng.randrange(20) for _ in range(rng.randrange(12)))
+        # Pad some records so probes land mid-line at varying offsets
+        lines = [b'{"k":%d,"pad":"%s"}' % (k, b"x" * rng.randrange(30)) for k in keys]
+        _write_lines(path, lines)
+        target = rng.randrange(-1, 22)
+        offset = bisect_records(path, lambda record: record["k"], target)
+        expected = sum(len(line) + 1 for line, k in zip(lines, keys) if k < target)
+        assert offset == expected
+
+
+def test_bisect_records_treats_half_written_tail_as_not_below(tmp_path):
+    path = tmp_path / "log.ndjson"
+    path.write_bytes(b'{"k":1}\n{"k":2}\n{"k":')
+    assert bisect_records(path, lambda record: record["k"], 5) == len(b'{"k":1}\n{"k":2}\n')
+
+
+def test_bisect_records_missing_file(tmp_path):
+    assert bisect_records(tmp_path / "nope.ndjson", lambda record: record["k"], 1) == 0
+
+
+def test_last_record_matches_brute_force(tmp_path):
+    rng = random.Random(1)
+    path = tmp_path / "log.ndjson"
+    for _ in range(100):
+        # Long records so the backwards scan has to cross chunk boundaries
+        records = [{"i": i, "pad": "x" * rng.randrange(6000)} for i in range(rng.randrange(5))]
+        _write_lines(path, [b'{"i":%d,"pad":"%s"}' % (r["i"], r["pad"].encode()) for r in records])
+        if rng.random() < 0.5:
+            with open(path, "ab") as f:
+                f.write(b'{"i":99,"pad":"trunc')  # Half-written last line
+        assert last_record(path) == (records[-1] if records else None)
+
+
+def test_last_record_missing_file(tmp_path):
+    assert last_record(tmp_path / "nope.ndjson") is None
+
+
+def test_append_then_rewrite_round_trip(tmp_path):
+    path = str(tmp_path / "log.ndjson")
+    append_records(path, [{"a": 1}, {"a": 2}])
+    assert list(iter_records(path)) == [{"a": 1}, {"a": 2}]
+    rewrite_records(path, [{"b": 1}])
+    append_record(path, {"b": 2})
+    assert list(iter_records(path)) == [{"b": 1}, {"b": 2}]
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_append_follows_a_file_replaced_behind_its_back(tmp_path):
+    path = str(tmp_path / "log.ndjson")
+    append_record(path, {"a": 1})  # Caches an append descriptor
+    replacement = tmp_path / "other.ndjson"
+    replacement.write_bytes(b'{"b":1}\n')
+    os.replace(replacement, path)  # What another process's compaction does
+    append_record(path, {"a": 2})
+    assert list(iter_records(path)) == [{"b": 1}, {"a": 2}]